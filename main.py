@@ -1,5 +1,5 @@
-import sys, os, time, datetime
-import pandas as pd
+import sys, os, time
+startup_time = time.perf_counter()
 from PyQt5 import uic, QtWidgets
 from PyQt5.QtGui import QIcon, QImage, QPixmap
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
@@ -11,7 +11,13 @@ from src.interval_dialog import IntervalDialog
 from utils.process_handler import WindowProcessHandler, create_directory_if_not_exists
 from utils.repeat_pattern import RepeatPattern, ItemType, SendKey
 from utils.template_matcher import UITemplateMatcher, get_all_images, get_subfolders #,load_and_resize_image
-from utils.ocr_finder import OCRFinder
+from utils.ocr_finder import OCRFinder, OCR_BACKENDS
+from utils.ocr_worker import OCRWorkerPool
+from utils.ocr_index import OCRTextIndex
+from utils.result_writer import ResultWriter
+from utils.lazy_import import import_report
+from utils.overlay_renderer import to_qimage
+from utils.image_writer import get_image_writer
 
 # opencv
 import cv2
@@ -92,7 +98,9 @@ class mainWindow(QtWidgets.QMainWindow):
         self.handler = WindowProcessHandler()
         # self.matcher = UITemplateMatcher(scale_range=(0.7, 1.5, 0.1))
         self.matcher = UITemplateMatcher(scale_range=(0.02, 0.7, 0.02))
-        self.ocrfinder = OCRFinder()
+        # OCR 은 별도 프로세스에서 실행 ( GUI 이벤트 루프와 분리 )
+        self.ocr_workers = OCRWorkerPool(num_workers=1)
+        self.ocrfinder = OCRFinder(worker_pool=self.ocr_workers)
         
         # List-up Running Process
         proc_lst = self.handler.get_running_process_list()
@@ -107,6 +115,12 @@ class mainWindow(QtWidgets.QMainWindow):
 
         self.repeater = RepeatPattern()
         self.repeater.receive_handler(self.handler)
+        # OCR_CLICK 텍스트 색인은 OCR 탐색과 캐시 / worker 를 공유
+        self.repeater.text_index = OCRTextIndex(cache=self.ocrfinder.cache, worker_pool=self.ocr_workers)
+        
+        # OCR backend 선택 ( Detect Text / OCR_CLICK 모두 적용 )
+        self.ocr_backend.addItems(OCR_BACKENDS)
+        self.ocr_backend.currentTextChanged.connect(self.update_ocr_backend)
         self.repeater.subfolder.connect(self.update_decision)
         self.repeater.finished.connect(self.clear)
         self.repeater.action_finished.connect(self.routine_result)
@@ -115,6 +129,7 @@ class mainWindow(QtWidgets.QMainWindow):
         
         self.is_rematch = False
         self.is_auto = False
+        self.result_writer = None
 
     # Event Section
     def resizeEvent(self, event):
@@ -122,6 +137,14 @@ class mainWindow(QtWidgets.QMainWindow):
         self.gui_result.setPixmap(scaled_pixmap)
 
     def closeEvent(self, event):
+        self.ocrfinder.cancel()
+        self.ocr_workers.close()
+        # 실행 중이던 루틴 기록도 닫고 변환
+        if self.repeater is not None and self.repeater.isRunning():
+            self.repeater.stop()
+            self.repeater.wait()
+        self.finish_result_writer()
+        get_image_writer().close()
         event.accept()
     
     def clear(self,finished):
@@ -144,6 +167,10 @@ class mainWindow(QtWidgets.QMainWindow):
             items = [item.data(Qt.UserRole) for item in self.action_sequence.findItems("", Qt.MatchContains)]
             self.repeater.receive_items(items)
             self.start_time = time.time()
+            # 동작마다 결과를 바로 기록 ( auto 재시작 / REMATCH 로 이어지는 루틴은 같은 파일에 계속 기록 )
+            if self.result_writer is None or self.result_writer.file is None:
+                self.result_writer = ResultWriter(scenario=f"pre-set{self.preset_combo.currentIndex()}").open()
+            self.repeater.result_writer = self.result_writer
             self.log_text.append("Start The Routine")
             self.repeater.start()
             
@@ -155,6 +182,8 @@ class mainWindow(QtWidgets.QMainWindow):
             self.repeater.stop()
             self.log_text.append("Stop The Routine")
             self.repeater.wait()
+            if self.result_writer is not None:
+                self.result_writer.close()
             self.showNormal()
 
     def routine_result(self, items):
@@ -162,24 +191,19 @@ class mainWindow(QtWidgets.QMainWindow):
         total_time = end_time - self.start_time
         print(total_time)
         print(items)
-        data = []
-        for idx, item in enumerate(items):
-            ptype = item[0].name  # Enum name, e.g., CLICK
-            action_name = item[1][0]
-            coordinates = f"{item[1][1][0]},{item[1][1][1]}"
-            preset = "pre-set0" if idx == 0 else ""
-            error = 0  # default value for error column
-            runtime = total_time if idx == 0 else ""  # set runtime only for the first row
-            data.append([preset, ptype, action_name, coordinates, error, runtime])
-
-        df = pd.DataFrame(data, columns=["Synario", "action", "name", "Position", "error", "RunTime"])
-
-        current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"action_items_{current_time}.xlsx"
-
-        df.to_excel(filename, index=False)
+        self.finish_result_writer()
 
-        print(f"Data has been saved to {filename}")
+    def finish_result_writer(self):
+        # 동작 단위 기록은 실행중에 이미 저장됨, 종료 후 Excel 로 변환
+        if self.result_writer is None:
+            return
+        result_writer = self.result_writer
+        self.result_writer = None
+        result_writer.close()
+        try:
+            result_writer.export(fmt="xlsx")
+        except Exception as e:
+            print(f"Result export failed : {e}")
 
 
     def open_browser(self):
@@ -216,7 +240,8 @@ class mainWindow(QtWidgets.QMainWindow):
         # self.handler.connect_application_by_handler(self.process_list.currentText())
         image  = self.handler.captuer_screen_on_application()
         self.ocrfinder.set_frame(image)
-        self.ocrfinder.set_region(image)
+        self.ocrfinder.renderer.set_max_size(self.gui_result.width(), self.gui_result.height())
+        self.ocrfinder.set_text_regions(image)
         self.ocrfinder.finished.connect(self.ocr_on_finished)
         self.ocrfinder.start()
     
@@ -247,17 +272,13 @@ class mainWindow(QtWidgets.QMainWindow):
 
         # scale range 조정부분
         h, w,_ = self.handler.captuer_screen_on_application().shape
-        if w > 2048 and w < 2560:
-            self.matcher.scale_range=(0.5, 1.2, 0.1)
-        elif w < 2048:
-            self.matcher.scale_range=(0.2, 0.7, 0.02)
-        else:
-            self.matcher.scale_range=(0.8, 2.0, 0.1)
+        self.matcher.update_scale_range(w)
         # threshhold = 0.9
         # self.matcher = UITemplateMatcher(image,templates, scale_range=(0.7, 1.0), scale_step=0.1)#,threshold=threshhold)
         # self.matcher.frame = image
         # self.matcher.templates = templates
         self.matcher.update_img_datas(image,templates)
+        self.matcher.renderer.set_max_size(self.gui_result.width(), self.gui_result.height())
         self.matcher.update_progress.connect(self.update_status_bar)  # 시그널 연결
         self.matcher.finished.connect(self.match_on_finished)  # 작업 완료 시그널 연결
         self.matcher.start()  # QThread 시작
@@ -266,6 +287,8 @@ class mainWindow(QtWidgets.QMainWindow):
     def ocr_on_finished(self, results):
         
         print(results)
+        self.log_text.append(self.ocr_workers.report())
+        self.log_text.append(import_report())
         result_img = self.ocrfinder.draw()
         self.gui_pixmap = self.view_resized_img_on_widget(result_img,self.gui_result.width(),self.gui_result.height())
         self.gui_result.setPixmap(self.gui_pixmap)
@@ -317,8 +340,9 @@ class mainWindow(QtWidgets.QMainWindow):
         folder_dir = os.getcwd()+"/screen"
         create_directory_if_not_exists(folder_dir)
         saved_file = folder_dir+"/gui_result.jpg"
-        cv2.imwrite(f"{saved_file}",result_image)
-        print(f"Screenshot saved as {saved_file}")
+        # 디스크 저장은 백그라운드에서 ( GUI 스레드 블로킹 방지 )
+        get_image_writer().write(saved_file, result_image)
+        print(f"Screenshot queued as {saved_file}")
             
         self.gui_pixmap = self.view_resized_img_on_widget(result_image,self.gui_result.width(),self.gui_result.height())
         self.gui_result.setPixmap(self.gui_pixmap)
@@ -337,16 +361,13 @@ class mainWindow(QtWidgets.QMainWindow):
             self.start_routine()    
     
     def view_resized_img_on_widget(self,frame, width, height):
-        # Show on PyQt5 layout
-        h, w, _ = frame.shape # _ 는 channel
-        bytes_per_line = 3 * w
-
-        frame_bytes = frame.tobytes()
-        q_img = QImage(frame_bytes, w, h, bytes_per_line, QImage.Format_RGB888)
-
-        # Re-scale QImage to fit layout
-        resized_img = q_img.scaled(width,height,Qt.KeepAspectRatio)
-        return QPixmap.fromImage(resized_img)
+        # Show on PyQt5 layout ( frame 은 이미 미리보기 크기, QImage 는 버퍼를 복사하지 않고 참조 )
+        q_img = to_qimage(frame)
+        
+        # Re-scale QImage to fit layout ( 크기가 다를 때만 )
+        if q_img.width() != width or q_img.height() != height:
+            q_img = q_img.scaled(width,height,Qt.KeepAspectRatio)
+        return QPixmap.fromImage(q_img)
     
     def confirm_running_process(self): ##
         # List-up Running Process
@@ -417,6 +438,18 @@ class mainWindow(QtWidgets.QMainWindow):
             if action[0] == 0:
                 self.action_sequence.addItem(f"Click (x,y : {action[1][0]}, {action[1][1]})")
                 
+    def update_ocr_backend(self, backend):
+        try:
+            self.ocrfinder.set_backend(backend)
+            self.repeater.set_ocr_backend(backend)
+            self.log_text.append(f"OCR backend : {backend}")
+        except RuntimeError as e:
+            # glyph atlas 가 없으면 기존 backend 유지
+            self.log_text.append(f"{e}")
+            self.ocr_backend.blockSignals(True)
+            self.ocr_backend.setCurrentText(self.ocrfinder.backend)
+            self.ocr_backend.blockSignals(False)
+        
     def update_process_list(self):
         msg = ""
         selected_proc = self.process_list.currentText()
@@ -479,9 +512,9 @@ class mainWindow(QtWidgets.QMainWindow):
                 msg = f"{name}, [{ItemType.REMATCH.name}, Coord:{mc_loc}, Conf:{100-int(score*100)}]"
             
             item = QtWidgets.QListWidgetItem(msg)
-            data = [ItemType.CLICK, [name, mc_loc]]
+            data = [ItemType.CLICK, [name, mc_loc, float(score)]]
             if is_match:
-                data = [ItemType.REMATCH, [name, mc_loc]]
+                data = [ItemType.REMATCH, [name, mc_loc, float(score)]]
             
             item.setData(Qt.UserRole, data)
             self.action_sequence.addItem(item)
@@ -537,4 +570,6 @@ if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     window = mainWindow()
     window.show()
+    print(f"Startup : {time.perf_counter() - startup_time:.2f} s")
+    print(import_report())
     sys.exit(app.exec_())
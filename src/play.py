@@ -21,6 +21,7 @@ import pyautogui
 import subprocess, psutil
 
 from utils.template_matcher import TemplateMatcher
+from utils.template_tracker import TemplateTracker
 
 window_ui = 'play.ui'
 
@@ -40,6 +41,9 @@ class ScreenCaptureThread(QThread):
         # 템플릿 이미지 로드
         self.template = cv2.imread(target_img, 0)
         self.template_w, self.template_h = self.template.shape[::-1]
+        
+        # 매 프레임 전체 화면 검색 대신 직전 위치 주변만 추적 ( detect_template_using_cv 와 같은 scale 범위 )
+        self.tracker = TemplateTracker(self.template, scale_range=(0.45, 0.85, 0.1), threshold=0.45)
             
     def detect_template_in_frame(self,frame,template, threshold = 0.45):
         
@@ -101,8 +105,11 @@ class ScreenCaptureThread(QThread):
                 img = np.array(screenshot)
                 img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
-                best_val, best_match, best_scale, best_loc = self.detect_template_using_cv(img)
-                if self.detect_template_in_frame(img,best_match):
+                # best_val, best_match, best_scale, best_loc = self.detect_template_using_cv(img)
+                result = self.tracker.update(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+                if result is not None:
+                    best_loc = result[0]
+                    best_match = self.tracker.template_at(self.tracker.scale)
                     
                     center_middle,crop_img = self.crop_template(img,best_match, best_loc)
 
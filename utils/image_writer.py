@@ -0,0 +1,118 @@
+import os
+import threading
+import queue
+
+import cv2
+
+'''
+ 디버그 / 데이터셋 이미지를 백그라운드 스레드에서 저장하는 writer
+ - 호출 스레드(GUI, 프레임 루프)는 큐에 넣기만 하고 바로 반환
+ - 큐가 가득 차면 기다리지 않고 버림 ( bounded queue )
+ - 인코딩 옵션 ( JPEG quality / PNG compression ), 샘플링, 디스크 사용량 제한
+
+ writer = AsyncImageWriter(jpeg_quality=90, sample_every=10, disk_budget_mb=500)
+ writer.write('lab_result/0.jpg', image)
+ writer.close()
+'''
+
+class AsyncImageWriter():
+
+    __slot__ = ['jpeg_quality','png_compression','sample_every','disk_budget','queue','thread','lock','counter','stats']
+
+    def __init__(self, max_queue=64, jpeg_quality=95, png_compression=3, sample_every=1, disk_budget_mb=None):
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        # N 번 요청 중 한번만 저장 ( 1 이면 전부 저장 )
+        self.sample_every = max(int(sample_every), 1)
+        self.disk_budget = None if disk_budget_mb is None else disk_budget_mb * 1024 * 1024
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.stats = {'written': 0, 'bytes': 0, 'dropped': 0, 'sampled_out': 0, 'over_budget': 0, 'errors': 0}
+        self.thread = threading.Thread(target=self.worker, daemon=True)
+        self.thread.start()
+
+    def encode_params(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.jpg', '.jpeg'):
+            return ext, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        if ext == '.png':
+            return ext, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        return ext, []
+
+    def write(self, path, image, copy=True, block=False):
+        # 저장 요청이 큐에 들어갔으면 True, 샘플링/큐 초과로 버려지면 False
+        # block=True 이면 큐가 가득 차도 버리지 않고 빈 자리가 날 때까지 대기 ( 데이터셋 생성용 )
+        with self.lock:
+            self.counter += 1
+            if (self.counter - 1) % self.sample_every != 0:
+                self.stats['sampled_out'] += 1
+                return False
+            if self.disk_budget is not None and self.stats['bytes'] >= self.disk_budget:
+                self.stats['over_budget'] += 1
+                return False
+        # 호출한 쪽에서 버퍼를 재사용할 수 있으므로 기본은 복사본 저장
+        try:
+            self.queue.put((path, image.copy() if copy else image), block=block)
+        except queue.Full:
+            with self.lock:
+                self.stats['dropped'] += 1
+            return False
+        return True
+
+    def worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            path, image = item
+            try:
+                ext, params = self.encode_params(path)
+                ok, encoded = cv2.imencode(ext, image, params)
+                if not ok:
+                    raise ValueError(f"encode failed : {path}")
+                with self.lock:
+                    over_budget = self.disk_budget is not None and self.stats['bytes'] + len(encoded) > self.disk_budget
+                    if over_budget:
+                        self.stats['over_budget'] += 1
+                if not over_budget:
+                    directory = os.path.dirname(path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    with open(path, 'wb') as image_file:
+                        image_file.write(encoded.tobytes())
+                    with self.lock:
+                        self.stats['written'] += 1
+                        self.stats['bytes'] += len(encoded)
+            except Exception as e:
+                print(f"Image write error ({path}) : {e}")
+                with self.lock:
+                    self.stats['errors'] += 1
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        # 큐에 남은 이미지가 모두 저장될 때까지 대기
+        self.queue.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def report(self):
+        stats = self.stats
+        return (f"Image writer : {stats['written']} written ({stats['bytes'] / 1024 / 1024:.1f} MB), "
+                f"{stats['dropped']} dropped, {stats['sampled_out']} sampled out, {stats['over_budget']} over budget")
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+def get_image_writer():
+    # GUI / OCR / 매칭 결과 저장에 공유하는 writer
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = AsyncImageWriter()
+        return _default_writer
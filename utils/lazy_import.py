@@ -0,0 +1,60 @@
+import sys, time
+import types
+import importlib
+import threading
+
+'''
+ 무거운 라이브러리 ( tensorflow/keras-ocr, torch, matplotlib, scipy ) 를
+ 처음 사용하는 시점에 import 하기 위한 모듈 프록시
+
+ keras_ocr = lazy_import("keras_ocr")
+ keras_ocr.pipeline.Pipeline()   # <- 여기서 실제 import
+'''
+
+_lock = threading.RLock()
+# module name -> import 에 걸린 시간 (ms), 아직 로드되지 않았으면 None
+import_times = {}
+
+class LazyModule(types.ModuleType):
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        with _lock:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                import_times[self.__name__] = (time.perf_counter() - start) * 1000
+                print(f"Lazy import '{self.__name__}' : {import_times[self.__name__]:.1f} ms")
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name):
+    # 이미 로드된 모듈은 그대로 사용
+    if name in sys.modules:
+        return sys.modules[name]
+    with _lock:
+        import_times.setdefault(name, None)
+    return LazyModule(name)
+
+def is_loaded(module):
+    return not isinstance(module, LazyModule) or module.__dict__['_lazy_module'] is not None
+
+def import_report():
+    lines = []
+    for name, elapsed in import_times.items():
+        state = "not loaded" if elapsed is None else f"{elapsed:.1f} ms"
+        lines.append(f"{name} : {state}")
+    return "\n".join(lines)
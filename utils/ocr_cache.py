@@ -0,0 +1,80 @@
+import os, json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import cv2
+
+'''
+ OCR 결과 캐시 ( 영역 이미지의 perceptual hash -> text + box )
+ - 메모리 : LRU
+ - 디스크 : JSONL 에 이어쓰기, 다음 실행시 다시 로드
+'''
+
+def region_hash(image, hash_size=16):
+    # difference hash (dHash) + 영역 크기 ( 크기가 다른 영역끼리 충돌 방지 )
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    h, w = image.shape[:2]
+    return f"{h // 4}x{w // 4}_{np.packbits(bits).tobytes().hex()}"
+
+class OCRCache():
+
+    __slot__ = ['max_entries','path','memory','disk','lock','hits','misses']
+
+    def __init__(self, max_entries=512, path="screen/ocr_cache.jsonl"):
+        self.max_entries = max_entries
+        self.path = path
+        self.memory = OrderedDict()
+        self.disk = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    self.disk[record['key']] = record['predictions']
+
+    def get(self, key):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+            if key in self.disk:
+                # 디스크 tier 에서 찾은 결과는 메모리로 올림
+                predictions = self.disk[key]
+                self.put_memory(key, predictions)
+                self.hits += 1
+                return predictions
+            self.misses += 1
+            return None
+
+    def put(self, key, predictions):
+        # predictions : [(text, box(4x2)), ...] 영역 좌표 기준
+        predictions = [(text, np.asarray(box).tolist()) for text, box in predictions]
+        with self.lock:
+            self.put_memory(key, predictions)
+            if self.path is not None and key not in self.disk:
+                self.disk[key] = predictions
+                with open(self.path, 'a', encoding='utf-8') as jsonl_file:
+                    jsonl_file.write(json.dumps({'key': key, 'predictions': predictions}, ensure_ascii=False) + "\n")
+
+    def put_memory(self, key, predictions):
+        self.memory[key] = predictions
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def report(self):
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total > 0 else 0
+        return f"OCR cache : {self.hits}/{total} hits ({ratio:.0f}%)"
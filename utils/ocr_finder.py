@@ -31,22 +31,342 @@ from tqdm import tqdm
 
 import numpy as np
 
-import keras_ocr
+import os
 import cv2
 import threading
+import time
+from concurrent.futures import CancelledError
+
+from utils.ocr_cache import OCRCache, region_hash
+from utils.lazy_import import lazy_import
+from utils.template_matcher import get_all_images
+from utils.overlay_renderer import OverlayRenderer
+from utils.image_writer import get_image_writer
+
+# TensorFlow 를 포함하므로 OCR 을 처음 사용할 때 로드
+keras_ocr = lazy_import("keras_ocr")
 
 '''
  pip install tensorflow==2.13.0 keras==2.13.1 keras-ocr==0.9.3
 '''
 
+def merge_boxes(boxes):
+    # 겹치거나 맞닿은 박스를 하나로 병합 (x, y, w, h)
+    merged = [list(box) for box in boxes]
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        while merged:
+            x, y, w, h = merged.pop(0)
+            idx = 0
+            while idx < len(merged):
+                ox, oy, ow, oh = merged[idx]
+                if x <= ox + ow and ox <= x + w and y <= oy + oh and oy <= y + h:
+                    nx, ny = min(x, ox), min(y, oy)
+                    w, h = max(x + w, ox + ow) - nx, max(y + h, oy + oh) - ny
+                    x, y = nx, ny
+                    merged.pop(idx)
+                    changed = True
+                else:
+                    idx += 1
+            result.append([x, y, w, h])
+        merged = result
+    return [tuple(box) for box in merged]
+
+def propose_text_regions(frame, scale=0.5, min_size=(8, 6), max_height=0.08, pad=6):
+    """
+    축소 프레임에서 morphological gradient 로 글자가 있을법한 영역을 찾습니다.
+    
+    :param frame: 입력 프레임 (BGR)
+    :param scale: 탐색에 사용할 축소 비율
+    :param min_size: 축소 프레임 기준 최소 (너비, 높이)
+    :param max_height: 프레임 높이 대비 글자 줄의 최대 높이 비율
+    :param pad: 원본 해상도 기준 박스 여백
+    :return: 원본 좌표 기준 박스 목록 [(x, y, w, h), ...]
+    """
+    h, w = frame.shape[:2]
+    small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    
+    # 글자 경계 강조 후 이진화
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    
+    # 가로 방향으로 글자들을 이어서 단어/문장 단위 영역 생성
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+    # 버튼 테두리 안쪽의 글자도 찾기 위해 외곽선만이 아닌 전체 윤곽선 사용
+    contours, _ = cv2.findContours(connected, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    
+    sh, sw = gray.shape[:2]
+    boxes = []
+    for contour in contours:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        if bw < min_size[0] or bh < min_size[1]:
+            continue
+        # 글자 줄은 가로로 길고 높이가 제한적 ( 버튼/패널 테두리 제외 )
+        if bh > max_height * sh or bw < bh or bw > 0.8 * sw:
+            continue
+        # 글자 영역 내 edge 비율이 너무 낮으면 제외
+        if cv2.countNonZero(binary[y:y+bh, x:x+bw]) < 0.12 * bw * bh:
+            continue
+        x0 = max(int(x / scale) - pad, 0)
+        y0 = max(int(y / scale) - pad, 0)
+        x1 = min(int((x + bw) / scale) + pad, w)
+        y1 = min(int((y + bh) / scale) + pad, h)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    
+    return merge_boxes(boxes)
+
+class OCRModel():
+    
+    # Keras-OCR 파이프라인은 프로세스당 한번만 로드해서 재사용
+    pipeline = None
+    lock = threading.Lock()
+    metrics = {'load_ms': None, 'inference_ms': [], 'images': 0}
+    
+    @classmethod
+    def get_pipeline(cls):
+        # 첫 OCR 요청 시점에 로드 (detector / recognizer 가중치)
+        with cls.lock:
+            if cls.pipeline is None:
+                start = time.perf_counter()
+                cls.pipeline = keras_ocr.pipeline.Pipeline()
+                cls.metrics['load_ms'] = (time.perf_counter() - start) * 1000
+                print(f"Keras-OCR pipeline loaded : {cls.metrics['load_ms']:.1f} ms")
+            return cls.pipeline
+    
+    @classmethod
+    def recognize(cls, images):
+        pipeline = cls.get_pipeline()
+        # 하나의 모델을 여러 스레드가 공유하므로 추론은 순차 실행
+        with cls.lock:
+            start = time.perf_counter()
+            prediction_groups = pipeline.recognize(images)
+            cls.metrics['inference_ms'].append((time.perf_counter() - start) * 1000)
+            cls.metrics['images'] += len(images)
+        return prediction_groups
+    
+    @classmethod
+    def is_loaded(cls):
+        return cls.pipeline is not None
+    
+    @classmethod
+    def report(cls):
+        inference = cls.metrics['inference_ms']
+        load_ms = cls.metrics['load_ms']
+        message = f"OCR load : {load_ms:.1f} ms" if load_ms is not None else "OCR load : -"
+        if len(inference) > 0:
+            message += f", inference : {len(inference)} calls, avg {sum(inference)/len(inference):.1f} ms, last {inference[-1]:.1f} ms"
+        return message
+
+GLYPH_SIZE = (16, 24) # (w, h)
+
+def binarize_text(image):
+    # 글자를 흰색(255), 배경을 검은색(0) 으로 이진화
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # 테두리 픽셀을 배경으로 보고 극성 결정
+    border = np.concatenate([binary[0], binary[-1], binary[:, 0], binary[:, -1]])
+    if np.mean(border) > 127:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+def split_touching(binary, spans, max_aspect):
+    # 붙어있는 글자는 가운데 부근의 가장 얇은 세로줄에서 분리
+    rows = np.flatnonzero(binary.max(axis=1) > 0)
+    line_h = rows[-1] + 1 - rows[0]
+    result = []
+    while spans:
+        x0, x1 = spans.pop(0)
+        if x1 - x0 <= max_aspect * line_h:
+            result.append((x0, x1))
+            continue
+        ink = np.count_nonzero(binary[:, x0:x1], axis=0)
+        lo, hi = (x1 - x0) // 4, (x1 - x0) * 3 // 4
+        cut = x0 + lo + int(np.argmin(ink[lo:hi]))
+        spans[:0] = [(x0, cut), (cut + 1, x1)] if cut + 1 < x1 else [(x0, cut)]
+    return result
+
+def segment_glyphs(binary, min_height_ratio=0.25, max_aspect=1.1):
+    # 세로 projection 으로 글자 단위 분리, (x, y, w, h) 목록 반환
+    cols = np.flatnonzero(binary.max(axis=0) > 0)
+    if len(cols) < 1:
+        return []
+    spans = [(span[0], span[-1] + 1) for span in np.split(cols, np.flatnonzero(np.diff(cols) > 1) + 1)]
+    spans = split_touching(binary, spans, max_aspect)
+    boxes = []
+    for x0, x1 in spans:
+        rows = np.flatnonzero(binary[:, x0:x1].max(axis=1) > 0)
+        boxes.append((int(x0), int(rows[0]), int(x1 - x0), int(rows[-1] + 1 - rows[0])))
+    # 잡음 제거 ( 줄 높이에 비해 너무 작은 조각 )
+    max_h = max(box[3] for box in boxes)
+    return [box for box in boxes if box[3] >= min_height_ratio * max_h or box[2] >= min_height_ratio * max_h]
+
+def normalize_glyph(binary, box):
+    # 비율을 유지한 채 GLYPH_SIZE 가운데에 배치 ( I / W 구분 ), 단위 벡터로 변환
+    x, y, w, h = box
+    crop = binary[y:y+h, x:x+w]
+    gw, gh = GLYPH_SIZE
+    scale = min(gw / w, gh / h)
+    rw, rh = max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+    canvas = np.zeros((gh, gw), dtype=np.float32)
+    ox, oy = (gw - rw) // 2, (gh - rh) // 2
+    canvas[oy:oy+rh, ox:ox+rw] = cv2.resize(crop, (rw, rh), interpolation=cv2.INTER_AREA)
+    vector = canvas.flatten()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+class GlyphAtlas():
+    
+    # 고정 폰트 글자 템플릿 모음 ( 샘플 캡쳐에서 글자를 잘라 등록 )
+    __slot__ = ['chars','vectors']
+    def __init__(self):
+        self.chars = []
+        self.vectors = np.zeros((0, GLYPH_SIZE[0] * GLYPH_SIZE[1]), dtype=np.float32)
+    
+    def add_sample(self, image, text):
+        # 글자 수와 분리된 glyph 수가 같을 때만 등록
+        binary = binarize_text(image)
+        boxes = segment_glyphs(binary)
+        chars = [c for c in text if not c.isspace()]
+        if len(boxes) != len(chars):
+            print(f"Glyph sample skipped '{text}' : {len(boxes)} glyphs / {len(chars)} chars")
+            return False
+        vectors = [normalize_glyph(binary, box) for box in boxes]
+        self.chars.extend(chars)
+        self.vectors = np.vstack([self.vectors] + [v[None, :] for v in vectors])
+        return True
+    
+    def build(self, sample_dir):
+        # sample_dir/<글자>.png : 파일 이름이 이미지 속 텍스트
+        for image_path in get_all_images(sample_dir):
+            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            text = os.path.splitext(os.path.basename(image_path))[0].split('_')[0]
+            self.add_sample(image, text)
+        return self
+    
+    def save(self, path):
+        np.savez_compressed(path, chars=np.array(self.chars), vectors=self.vectors)
+    
+    def load(self, path):
+        data = np.load(path)
+        self.chars = [str(c) for c in data['chars']]
+        self.vectors = data['vectors'].astype(np.float32)
+        return self
+    
+    def read(self, image, min_score=0.6, space_ratio=0.35):
+        # 한 줄 이미지를 읽어서 keras-ocr 과 같은 [(word, box(4x2)), ...] 형식으로 반환
+        if len(self.chars) < 1:
+            return []
+        binary = binarize_text(image)
+        boxes = segment_glyphs(binary)
+        if len(boxes) < 1:
+            return []
+        # 모든 glyph 을 한번에 비교 ( cosine similarity )
+        queries = np.stack([normalize_glyph(binary, box) for box in boxes])
+        scores = queries @ self.vectors.T
+        best = scores.argmax(axis=1)
+        
+        space = space_ratio * np.median([box[3] for box in boxes])
+        words = []
+        word, word_boxes, prev_x1 = "", [], None
+        for box, idx, score in zip(boxes, best, scores[np.arange(len(boxes)), best]):
+            if prev_x1 is not None and box[0] - prev_x1 > space and word:
+                words.append((word, word_boxes))
+                word, word_boxes = "", []
+            if score >= min_score:
+                word += self.chars[idx]
+                word_boxes.append(box)
+            prev_x1 = box[0] + box[2]
+        if word:
+            words.append((word, word_boxes))
+        
+        predictions = []
+        for word, word_boxes in words:
+            x0 = min(b[0] for b in word_boxes)
+            y0 = min(b[1] for b in word_boxes)
+            x1 = max(b[0] + b[2] for b in word_boxes)
+            y1 = max(b[1] + b[3] for b in word_boxes)
+            predictions.append((word.lower(), np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)))
+        return predictions
+
+OCR_BACKENDS = ["keras", "glyph"]
+
+class GlyphOCRModel():
+    
+    # 고정 폰트용 경량 OCR ( glyph 템플릿 매칭, CPU 에서 수 ms )
+    atlas = None
+    lock = threading.Lock()
+    atlas_path = "screen/glyph_atlas.npz"
+    sample_dir = "screen/glyphs"
+    metrics = {'load_ms': None, 'inference_ms': [], 'images': 0}
+    
+    @classmethod
+    def get_atlas(cls):
+        with cls.lock:
+            if cls.atlas is None:
+                start = time.perf_counter()
+                if os.path.exists(cls.atlas_path):
+                    atlas = GlyphAtlas().load(cls.atlas_path)
+                else:
+                    atlas = GlyphAtlas().build(cls.sample_dir) if os.path.isdir(cls.sample_dir) else GlyphAtlas()
+                # 빈 atlas 는 모든 화면에서 텍스트 없음으로 읽히므로 저장하지 않고 오류로 알림
+                if len(atlas.chars) < 1:
+                    raise RuntimeError(f"Glyph OCR atlas is empty : add glyph samples to '{cls.sample_dir}' "
+                                       f"( file name = text, ex. Play.png ) or build '{cls.atlas_path}'")
+                cls.atlas = atlas
+                cls.metrics['load_ms'] = (time.perf_counter() - start) * 1000
+                print(f"Glyph atlas loaded : {len(cls.atlas.chars)} glyphs, {cls.metrics['load_ms']:.1f} ms")
+            return cls.atlas
+    
+    @classmethod
+    def set_atlas(cls, atlas):
+        with cls.lock:
+            cls.atlas = atlas
+    
+    @classmethod
+    def recognize(cls, images):
+        atlas = cls.get_atlas()
+        start = time.perf_counter()
+        prediction_groups = [atlas.read(image) for image in images]
+        with cls.lock:
+            cls.metrics['inference_ms'].append((time.perf_counter() - start) * 1000)
+            cls.metrics['images'] += len(images)
+        return prediction_groups
+    
+    @classmethod
+    def report(cls):
+        inference = cls.metrics['inference_ms']
+        message = f"Glyph OCR : {len(cls.atlas.chars) if cls.atlas is not None else 0} glyphs"
+        if len(inference) > 0:
+            message += f", inference : {len(inference)} calls, avg {sum(inference)/len(inference):.2f} ms, last {inference[-1]:.2f} ms"
+        return message
+
 class OCRFinder(QThread):
     # finished = pyqtSignal(np.ndarray)
     finished = pyqtSignal(list)
     
-    __slot__ = ["regions","lock","results","frame"]
-    def __init__(self):
+    __slot__ = ["regions","offsets","lock","results","frame","max_batch_size","cache","worker_pool","futures","backend","renderer"]
+    def __init__(self, max_batch_size=8, cache=None, worker_pool=None, backend="keras"):
         super().__init__()
+        # "keras" : keras-ocr ( CRAFT + CRNN ), "glyph" : 고정 폰트 glyph 매칭
+        self.backend = backend
         self.regions = []
+        self.offsets = [] # 각 영역의 프레임 내 좌상단 좌표
+        # 한번의 recognize 호출에 묶을 최대 영역 수
+        self.max_batch_size = max_batch_size
+        # 같은 메뉴 화면은 반복해서 나오므로 영역 hash 로 결과 재사용
+        self.cache = cache if cache is not None else OCRCache()
+        # OCRWorkerPool 이 있으면 별도 프로세스에서 인식 ( 없으면 현재 프로세스 )
+        self.worker_pool = worker_pool
+        self.futures = []
+        self.renderer = OverlayRenderer()
         # self.pipeline = keras_ocr.pipeline.Pipeline()# Keras-OCR 파이프라인 생성
         # 이미지 로드
         self.lock = threading.Lock()# 멀티쓰레드 설정
@@ -55,89 +375,170 @@ class OCRFinder(QThread):
     
     def set_frame(self,frame):
         self.frame = frame
+    
+    def set_backend(self,backend):
+        # "keras" | "glyph" ( glyph 는 atlas 를 먼저 로드해서 비어있으면 RuntimeError )
+        if backend not in OCR_BACKENDS:
+            raise ValueError(f"Unknown OCR backend : {backend}")
+        if backend == "glyph":
+            GlyphOCRModel.get_atlas()
+        self.backend = backend
         
     def set_regions(self,image_paths):
         self.regions = [keras_ocr.tools.read(image_path) for image_path in image_paths]
+        self.offsets = [(0, 0)] * len(self.regions)
+    
+    def set_text_regions(self,frame:np.array):
+        # 글자가 있을법한 영역만 잘라서 인식 대상으로 등록
+        boxes = propose_text_regions(frame)
+        if len(boxes) < 1:
+            self.set_region(frame)
+            return boxes
+        for x, y, w, h in boxes:
+            self.set_region(frame[y:y+h, x:x+w], (x, y))
+        return boxes
     
-    def set_region(self,image:np.array):
+    def set_region(self,image:np.array,offset=(0, 0)):
         # canny_threshold1 = 220
         # canny_threshold2 = 500
         # edges_template = cv2.Canny(image, canny_threshold1, canny_threshold2)
         # edges_template = cv2.cvtColor(edges_template, cv2.COLOR_GRAY2RGB)
         # self.regions.append(edges_template)
         self.regions.append(image)
+        self.offsets.append(offset)
         
         
-    def recognize(self,semaphore,image,pbar):
-        with semaphore:
+    def make_batches(self, indices):
+        # 크기가 비슷한 영역끼리 묶음 ( keras-ocr 가 내부에서 resize / 패딩하므로 직접 패딩하지 않음 )
+        order = sorted(indices, key=lambda i: self.regions[i].shape[0] * self.regions[i].shape[1])
+        return [order[i:i+self.max_batch_size] for i in range(0, len(order), self.max_batch_size)]
+    
+    def add_results(self, idx, predictions):
+        # 영역 좌표를 프레임 좌표로 변환
+        offset = np.array(self.offsets[idx], dtype=np.float32)
+        with self.lock:
+            self.results.extend([(text, np.asarray(box, dtype=np.float32) + offset) for text, box in predictions])
+    
+    def lookup_cache(self, pbar):
+        # 캐시에 없는 영역의 index 와 hash 반환
+        pending = []
+        keys = {}
+        for idx, region in enumerate(self.regions):
+            key = region_hash(region)
+            predictions = self.cache.get(key)
+            if predictions is None:
+                pending.append(idx)
+                keys[idx] = key
+                continue
+            self.add_results(idx, predictions)
             pbar.update(1)
-            pipeline = keras_ocr.pipeline.Pipeline()# Keras-OCR 파이프라인 생성
-            prediction_groups = pipeline.recognize([image])
-            with self.lock:
-                self.results.extend(prediction_groups[0])
-                # for (text, box) in enumerate(prediction_groups[0]):
-                #     (top_left, top_right, bottom_right, bottom_left) = box
-                #     top_left = tuple(map(int, top_left))
-                #     top_right = tuple(map(int, top_right))
-                #     bottom_right = tuple(map(int, bottom_right))
-                #     bottom_left = tuple(map(int, bottom_left))
+        return pending, keys
+    
+    def recognize(self,batch,keys,pbar):
+        images = [self.regions[i] for i in batch]
+        prediction_groups = OCRModel.recognize(images)
+        self.collect(batch, keys, prediction_groups, pbar)
+    
+    def collect(self,batch,keys,prediction_groups,pbar):
+        pbar.update(len(batch))
+        for i, predictions in zip(batch, prediction_groups):
+            self.cache.put(keys[i], predictions)
+            self.add_results(i, predictions)
+    
+    def recognize_in_workers(self,batches,keys,pbar):
+        # 모든 배치를 worker 큐에 먼저 넣고 완료 순서대로 결과 수집
+        self.futures = [(batch, self.worker_pool.submit([self.regions[i] for i in batch])) for batch in batches]
+        for batch, future in self.futures:
+            if future.cancelled():
+                continue
+            try:
+                prediction_groups = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                # worker 오류는 해당 배치만 건너뜀 ( glyph 와 같이 로그만 남기고 나머지 결과는 전달 )
+                print(f"OCR batch failed : {e}")
+                pbar.update(len(batch))
+                continue
+            self.collect(batch, keys, prediction_groups, pbar)
+        self.futures = []
                 
     def run(self):
         
         self.results.clear()
         
-        threads = []
-        max_threads = 4
-        semaphore = threading.Semaphore(max_threads)
-        
         self.total_tasks = len(self.regions)
         # print(f"self.total_tasks : { self.total_tasks }")
-        # 각 영역에 대해 스레드 생성 및 시작
-        with tqdm(total=self.total_tasks, desc="Finding OCR") as pbar:
-            for region in self.regions:
-                thread = threading.Thread(target=self.recognize, args=(semaphore, region, pbar))
-                threads.append(thread)
-                thread.start()
-
-            # 모든 스레드가 완료될 때까지 대기
-            for thread in threads:
-                thread.join()
-            
-            self.finished.emit(self.results)
+        # 영역들을 배치로 묶어서 한번에 인식
+        # 인식 중 오류가 나도 finished 는 항상 전달하고 이번 요청의 영역은 비움 ( 다음 요청에 남지 않도록 )
+        try:
+            with tqdm(total=self.total_tasks, desc="Finding OCR") as pbar:
+                if self.backend == "glyph":
+                    # 수 ms 안에 끝나므로 캐시/배치 없이 바로 인식
+                    try:
+                        for idx, predictions in enumerate(GlyphOCRModel.recognize(self.regions)):
+                            self.add_results(idx, predictions)
+                        print(GlyphOCRModel.report())
+                    except RuntimeError as e:
+                        print(e)
+                    pbar.update(self.total_tasks)
+                    return
+                
+                pending, keys = self.lookup_cache(pbar)
+                if self.worker_pool is not None:
+                    self.recognize_in_workers(self.make_batches(pending), keys, pbar)
+                else:
+                    try:
+                        for batch in self.make_batches(pending):
+                            self.recognize(batch, keys, pbar)
+                    except Exception as e:
+                        print(f"OCR failed : {e!r}")
+                
+                print(self.worker_pool.report() if self.worker_pool is not None else OCRModel.report())
+                print(self.cache.report())
+        finally:
+            self.futures = []
             self.regions.clear()
+            self.offsets.clear()
+            self.finished.emit(self.results)
+    
+    def cancel(self):
+        # 아직 실행되지 않은 OCR 요청 취소
+        for _, future in self.futures:
+            future.cancel()
     
     def stop(self):
+        self.cancel()
         self.wait()
         
     def draw(self):
-        # draw_results = []
-        # 결과 출력 및 바운딩 박스 그리기
-        for i, (text, box) in enumerate(self.results):
-            # print(f"Image {i+1} - Text: {text}")
-            # print(f"Image {i+1} - Text: {text}, Bounding Box: {box}")
-
-            # 바운딩 박스 좌표 추출
-            (top_left, top_right, bottom_right, bottom_left) = box
-            top_left = tuple(map(int, top_left))
-            top_right = tuple(map(int, top_right))
-            bottom_right = tuple(map(int, bottom_right))
-            bottom_left = tuple(map(int, bottom_left))
-
-            # 바운딩 박스 그리기
-            cv2.line(self.frame, top_left, top_right, (0, 255, 0), 4)
-            cv2.line(self.frame, top_right, bottom_right, (0, 255, 0), 4)
-            cv2.line(self.frame, bottom_right, bottom_left, (0, 255, 0), 4)
-            cv2.line(self.frame, bottom_left, top_left, (0, 255, 0), 4)
-
-            # 텍스트 표시
-            cv2.putText(self.frame, text, (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 4)
-
-            
-            # 결과 이미지 저장
-            # result_path = f'result_{i+1}.png'
-            # cv2.imwrite(result_path, self.frame)
-            # print(f"Result saved to {result_path}")
+        # 원본 프레임은 그대로 두고 미리보기 크기 복사본에 결과 표시
+        preview = self.renderer.draw_ocr(self.frame, self.results)
         result_path = f'screen/result_ocr.png'
-        cv2.imwrite(result_path, self.frame)
-        print(f"Result saved to {result_path}")
-        return self.frame
\ No newline at end of file
+        get_image_writer().write(result_path, preview)
+        print(f"Result queued to {result_path}")
+        return preview
+
+def benchmark_ocr_backends(frame_path="screen/result_ocr.png", repeat=5):
+    # 같은 프레임의 텍스트 후보 영역에 대해 glyph 매칭과 keras-ocr 속도를 비교
+    frame = cv2.imread(frame_path, cv2.IMREAD_COLOR)
+    boxes = propose_text_regions(frame)
+    regions = [frame[y:y+h, x:x+w] for x, y, w, h in boxes]
+    print(f"{frame_path} : {len(regions)} regions")
+    
+    results = {}
+    backends = [("glyph", GlyphOCRModel.recognize), ("keras", OCRModel.recognize)]
+    for name, recognize in backends:
+        try:
+            recognize(regions[:1]) # 모델/atlas 로드는 제외
+        except ImportError as e:
+            print(f"{name:>6} : skipped ({e})")
+            continue
+        start = time.perf_counter()
+        for _ in range(repeat):
+            prediction_groups = recognize(regions)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        texts = [text for predictions in prediction_groups for text, _ in predictions]
+        results[name] = (elapsed, texts)
+        print(f"{name:>6} : {elapsed:.2f} ms / frame, {texts}")
+    return results
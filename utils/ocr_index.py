@@ -0,0 +1,151 @@
+import re
+import time
+import threading
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from utils.ocr_cache import OCRCache, region_hash
+from utils.ocr_finder import OCRModel, GlyphOCRModel, OCR_BACKENDS, propose_text_regions
+
+'''
+ 현재 화면의 OCR 텍스트 색인 ( 정규화된 텍스트 -> 프레임 좌표 박스 )
+ - 템플릿 이미지 없이 "Create" 라벨 클릭 같은 동작에 사용
+ - 영역 hash 가 같은 텍스트 영역은 이전 결과를 재사용 ( 연속된 단계 사이의 갱신 비용 최소화 )
+
+ index = OCRTextIndex()
+ index.update(frame)
+ text, box, score = index.lookup("Create")
+'''
+
+def normalize_text(text):
+    # 대소문자, 공백, 기호 차이 무시
+    return re.sub(r'[^0-9a-z가-힣]', '', str(text).lower())
+
+def box_center(box):
+    box = np.asarray(box, dtype=np.float32)
+    return [int(box[:, 0].mean()), int(box[:, 1].mean())]
+
+def union_box(boxes):
+    points = np.concatenate([np.asarray(box, dtype=np.float32) for box in boxes])
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float32)
+
+class OCRTextIndex():
+
+    __slot__ = ['cache','backend','worker_pool','min_similarity','regions','entries','lock','stats']
+
+    def __init__(self, cache=None, backend="keras", worker_pool=None, min_similarity=0.75):
+        self.cache = cache if cache is not None else OCRCache()
+        # "keras" | "glyph" ( OCRFinder 와 동일 )
+        self.backend = backend
+        self.worker_pool = worker_pool
+        self.min_similarity = min_similarity
+        self.regions = {}   # region hash -> 영역 좌표 기준 predictions ( 직전 화면 )
+        self.entries = []   # [(normalized text, text, box), ...] 프레임 좌표 기준
+        self.lock = threading.Lock()
+        self.stats = {'updates': 0, 'reused': 0, 'recognized': 0, 'update_ms': None}
+
+    def set_backend(self, backend):
+        # OCRFinder.set_backend 와 동일한 검사 후 이전 결과는 버림 ( backend 마다 인식 결과가 다름 )
+        if backend not in OCR_BACKENDS:
+            raise ValueError(f"Unknown OCR backend : {backend}")
+        if backend == "glyph":
+            GlyphOCRModel.get_atlas()
+        with self.lock:
+            self.backend = backend
+            self.regions = {}
+            self.entries = []
+
+    def recognize(self, images):
+        if len(images) < 1:
+            return []
+        if self.backend == "glyph":
+            return GlyphOCRModel.recognize(images)
+        if self.worker_pool is not None:
+            return self.worker_pool.submit(images).result()
+        return OCRModel.recognize(images)
+
+    def update(self, frame):
+        # 텍스트 후보 영역만 다시 계산하고, 바뀐 영역만 인식
+        start = time.perf_counter()
+        boxes = propose_text_regions(frame)
+        if len(boxes) < 1:
+            # 후보 영역이 없으면 전체 화면을 인식 ( OCRFinder.set_text_regions 와 동일 )
+            boxes = [(0, 0, frame.shape[1], frame.shape[0])]
+        keys = []
+        pending = []
+        predictions = {}
+        for x, y, w, h in boxes:
+            key = region_hash(frame[y:y+h, x:x+w])
+            keys.append(key)
+            if key in predictions or key in pending:
+                continue
+            cached = self.regions.get(key)
+            if cached is None and self.backend != "glyph":
+                cached = self.cache.get(key)
+            if cached is None:
+                pending.append(key)
+            else:
+                predictions[key] = cached
+                self.stats['reused'] += 1
+
+        if len(pending) > 0:
+            crops = {key: frame[y:y+h, x:x+w] for key, (x, y, w, h) in zip(keys, boxes)}
+            for key, result in zip(pending, self.recognize([crops[key] for key in pending])):
+                result = [(text, np.asarray(box).tolist()) for text, box in result]
+                predictions[key] = result
+                if self.backend != "glyph":
+                    self.cache.put(key, result)
+            self.stats['recognized'] += len(pending)
+
+        entries = []
+        for key, (x, y, w, h) in zip(keys, boxes):
+            offset = np.array([x, y], dtype=np.float32)
+            words = [(text, np.asarray(box, dtype=np.float32) + offset) for text, box in predictions[key]]
+            for text, box in words:
+                entries.append((normalize_text(text), text, box))
+            # 여러 단어로 된 라벨 ( ex. "Quit Game" ) 은 영역 전체 텍스트로도 색인
+            if len(words) > 1:
+                words.sort(key=lambda word: word[1][:, 0].min())
+                text = " ".join(text for text, _ in words)
+                entries.append((normalize_text(text), text, union_box([box for _, box in words])))
+
+        with self.lock:
+            self.regions = predictions
+            self.entries = entries
+            self.stats['updates'] += 1
+            self.stats['update_ms'] = (time.perf_counter() - start) * 1000
+        return entries
+
+    def lookup(self, label):
+        # (text, box, similarity) 반환, 없으면 None
+        target = normalize_text(label)
+        if not target:
+            return None
+        best = None
+        with self.lock:
+            entries = list(self.entries)
+        for norm, text, box in entries:
+            if norm == target:
+                return text, box, 1.0
+            score = SequenceMatcher(None, target, norm).ratio()
+            if score >= self.min_similarity and (best is None or score > best[2]):
+                best = (text, box, score)
+        return best
+
+    def find_center(self, label):
+        found = self.lookup(label)
+        if found is None:
+            return None
+        return box_center(found[1])
+
+    def texts(self):
+        with self.lock:
+            return [text for _, text, _ in self.entries]
+
+    def report(self):
+        stats = self.stats
+        update_ms = "-" if stats['update_ms'] is None else f"{stats['update_ms']:.1f} ms"
+        return f"OCR index : {len(self.entries)} texts, last update {update_ms}, reused {stats['reused']}, recognized {stats['recognized']}"
@@ -0,0 +1,227 @@
+import time
+import threading
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import Future
+
+import numpy as np
+
+'''
+ OCR 을 별도 프로세스에서 실행하는 worker
+ - GUI 프로세스와 TensorFlow 스레드가 경쟁하지 않도록 분리
+ - 요청/응답은 Pipe, 이미지는 shared memory 로 전달
+ - worker 수를 늘려 배치 실행시 OCR 처리량 확장
+
+ pool = OCRWorkerPool(num_workers=2)
+ future = pool.submit(images)      # concurrent.futures.Future
+ prediction_groups = future.result()
+'''
+
+def pack_images(images):
+    # 여러 이미지를 하나의 shared memory 블록에 연속으로 복사
+    images = [np.ascontiguousarray(image) for image in images]
+    for image in images:
+        # object 배열 등은 shared memory 로 전달할 수 없으므로 worker 로 보내기 전에 거부
+        if image.dtype.hasobject or image.ndim not in (2, 3):
+            raise ValueError(f"OCR image must be a 2D/3D numeric array : dtype={image.dtype}, shape={image.shape}")
+    total = max(sum(image.nbytes for image in images), 1)
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    layout = []
+    offset = 0
+    for image in images:
+        buffer = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf, offset=offset)
+        buffer[:] = image
+        layout.append((offset, image.shape, image.dtype.str))
+        offset += image.nbytes
+    return shm, layout
+
+def unpack_images(shm, layout):
+    # shared memory 를 닫기 전에 복사해서 사용
+    return [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset).copy() for offset, shape, dtype in layout]
+
+def worker_main(conn):
+    # worker 프로세스 : 파이프라인은 첫 요청시 한번만 로드
+    from utils.ocr_finder import OCRModel
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        response = {'id': request['id'], 'predictions': None, 'error': None}
+        try:
+            shm = shared_memory.SharedMemory(name=request['shm'])
+            try:
+                images = unpack_images(shm, request['layout'])
+            finally:
+                shm.close()
+            start = time.perf_counter()
+            prediction_groups = OCRModel.recognize(images)
+            response['inference_ms'] = (time.perf_counter() - start) * 1000
+            response['load_ms'] = OCRModel.metrics['load_ms']
+            response['predictions'] = [[(text, np.asarray(box).tolist()) for text, box in predictions] for predictions in prediction_groups]
+        except Exception as e:
+            response['error'] = repr(e)
+        conn.send(response)
+    conn.close()
+
+class OCRWorker():
+
+    __slot__ = ['process','conn']
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def request(self, request):
+        self.conn.send(request)
+        return self.conn.recv()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+class OCRWorkerPool():
+
+    __slot__ = ['num_workers','context','requests','workers','threads','lock','next_id','metrics','closed']
+
+    def __init__(self, num_workers=1):
+        self.num_workers = num_workers
+        self.context = None
+        self.requests = queue.Queue()
+        self.workers = []
+        self.threads = []
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.metrics = {'load_ms': None, 'inference_ms': [], 'images': 0, 'cancelled': 0, 'restarts': 0}
+        self.closed = False
+
+    def start(self):
+        # 프로그램 시작 시간을 늘리지 않도록 첫 요청 시점에 worker 실행
+        with self.lock:
+            if len(self.workers) > 0:
+                return
+            self.context = mp.get_context("spawn")
+            for slot in range(self.num_workers):
+                worker = OCRWorker(self.context)
+                thread = threading.Thread(target=self.dispatch, args=(slot,), daemon=True)
+                self.workers.append(worker)
+                self.threads.append(thread)
+                thread.start()
+
+    def submit(self, images):
+        if self.closed:
+            raise RuntimeError("OCRWorkerPool is closed")
+        self.start()
+        future = Future()
+        with self.lock:
+            request_id = self.next_id
+            self.next_id += 1
+        self.requests.put((request_id, images, future))
+        return future
+
+    def restart(self, slot):
+        # 종료된 worker 프로세스를 새로 실행 ( 이후 요청이 죽은 pipe 로 가지 않도록 )
+        old = self.workers[slot]
+        try:
+            old.close()
+        except Exception:
+            pass
+        self.workers[slot] = OCRWorker(self.context)
+        with self.lock:
+            self.metrics['restarts'] += 1
+        print(f"OCR worker {slot} restarted")
+
+    def run_request(self, slot, request_id, images):
+        shm, layout = pack_images(images)
+        try:
+            try:
+                response = self.workers[slot].request({'id': request_id, 'shm': shm.name, 'layout': layout})
+            except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+                if not self.closed:
+                    self.restart(slot)
+                raise RuntimeError(f"OCR worker stopped : {e!r}")
+        finally:
+            shm.close()
+            shm.unlink()
+
+        if response['error'] is not None:
+            raise RuntimeError(response['error'])
+        with self.lock:
+            self.metrics['load_ms'] = response['load_ms']
+            self.metrics['inference_ms'].append(response['inference_ms'])
+            self.metrics['images'] += len(images)
+        return response['predictions']
+
+    def dispatch(self, slot):
+        # worker 하나당 스레드 하나, 큐에 쌓인 요청을 순서대로 전달
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            request_id, images, future = item
+            # 대기 중에 취소된 요청은 건너뜀
+            if not future.set_running_or_notify_cancel():
+                with self.lock:
+                    self.metrics['cancelled'] += 1
+                continue
+
+            # 이미지 packing 실패 / worker 종료 등 어떤 오류든 future 에 전달 ( 호출한 쪽이 무한 대기하지 않도록 )
+            try:
+                future.set_result(self.run_request(slot, request_id, images))
+            except Exception as e:
+                future.set_exception(e)
+
+    def cancel_all(self):
+        # 아직 worker 로 전달되지 않은 요청 취소
+        cancelled = 0
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)
+                break
+            if item[2].cancel():
+                cancelled += 1
+        with self.lock:
+            self.metrics['cancelled'] += cancelled
+        return cancelled
+
+    def report(self):
+        inference = self.metrics['inference_ms']
+        load_ms = self.metrics['load_ms']
+        message = f"OCR workers : {len(self.workers)}"
+        message += f", load : {load_ms:.1f} ms" if load_ms is not None else ", load : -"
+        if len(inference) > 0:
+            message += f", inference : {len(inference)} calls, avg {sum(inference)/len(inference):.1f} ms, last {inference[-1]:.1f} ms"
+        if self.metrics['cancelled'] > 0:
+            message += f", cancelled : {self.metrics['cancelled']}"
+        if self.metrics['restarts'] > 0:
+            message += f", restarts : {self.metrics['restarts']}"
+        return message
+
+    def close(self):
+        self.closed = True
+        self.cancel_all()
+        for _ in self.threads:
+            self.requests.put(None)
+        for thread in self.threads:
+            thread.join()
+        for worker in self.workers:
+            worker.close()
+        self.workers.clear()
+        self.threads.clear()
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import cv2
+
+from PyQt5.QtGui import QImage
+
+'''
+ 매칭 / OCR 결과 미리보기 renderer
+ - 원본 프레임은 수정하지 않고 미리보기 크기로 축소한 복사본에만 그림
+ - 미리보기 버퍼는 크기가 바뀔 때만 새로 할당해서 재사용
+ - Qt 에는 NumPy 버퍼를 그대로 참조하는 QImage 전달 ( tobytes 복사 없음 )
+'''
+
+class OverlayRenderer():
+
+    __slot__ = ['max_size','buffer','scale','lock']
+
+    def __init__(self, max_size=(1280, 720)):
+        self.max_size = max_size
+        self.buffer = None
+        self.scale = 1.0
+        self.lock = threading.Lock()
+
+    def set_max_size(self, width, height):
+        self.max_size = (max(int(width), 1), max(int(height), 1))
+
+    def prepare(self, frame):
+        # 비율을 유지한 미리보기 크기로 축소 ( 확대는 하지 않음 )
+        h, w = frame.shape[:2]
+        self.scale = min(self.max_size[0] / w, self.max_size[1] / h, 1.0)
+        size = (max(int(w * self.scale), 1), max(int(h * self.scale), 1))
+        if self.buffer is None or self.buffer.shape[:2] != (size[1], size[0]):
+            self.buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        if self.scale == 1.0:
+            np.copyto(self.buffer, frame[:, :, :3])
+        else:
+            cv2.resize(frame[:, :, :3], size, dst=self.buffer, interpolation=cv2.INTER_AREA)
+        return self.buffer
+
+    def to_preview(self, point):
+        return (int(point[0] * self.scale), int(point[1] * self.scale))
+
+    def thickness(self, value):
+        return max(int(round(value * self.scale)), 1)
+
+    def draw_matches(self, frame, matches):
+        # matches : [(loc, scale, score, (path, template)), ...] 원본 좌표 기준
+        with self.lock:
+            preview = self.prepare(frame)
+            font_scale = max(1.2 * self.scale, 0.4)
+            for loc, scale, score, template in matches:
+                top_left = loc
+                bottom_right = (top_left[0] + int(template[1].shape[1] * scale), top_left[1] + int(template[1].shape[0] * scale))
+                name = template[0].split("\\")[-1]
+                top_left, bottom_right = self.to_preview(top_left), self.to_preview(bottom_right)
+                cv2.rectangle(preview, top_left, bottom_right, (0, 255, 0), self.thickness(4))
+                cv2.putText(preview, f'{name}', (top_left[0], bottom_right[1] + self.thickness(25)), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), self.thickness(2))
+            return preview
+
+    def draw_ocr(self, frame, results):
+        # results : [(text, box(4x2)), ...] 원본 좌표 기준
+        with self.lock:
+            preview = self.prepare(frame)
+            font_scale = max(0.9 * self.scale, 0.4)
+            for text, box in results:
+                points = (np.asarray(box, dtype=np.float32) * self.scale).astype(np.int32)
+                cv2.polylines(preview, [points], True, (0, 255, 0), self.thickness(4))
+                cv2.putText(preview, text, (int(points[0][0]), int(points[0][1]) - self.thickness(10)), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 255, 0), self.thickness(4))
+            return preview
+
+def to_qimage(image):
+    # NumPy 버퍼를 복사하지 않고 참조하는 QImage
+    # QImage 는 버퍼를 소유하지 않으므로 참조한 배열을 QImage 에 붙여서 함께 유지
+    # ( ascontiguousarray 가 새 배열을 만든 경우에도 해제되지 않도록 )
+    image = np.ascontiguousarray(image)
+    h, w = image.shape[:2]
+    if hasattr(QImage, "Format_BGR888"):
+        q_img = QImage(image.data, w, h, image.strides[0], QImage.Format_BGR888)
+        q_img.ndarray = image
+        return q_img
+    # Qt 5.14 미만은 BGR 포맷이 없으므로 RGB 로 변환
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    q_img = QImage(rgb.data, w, h, rgb.strides[0], QImage.Format_RGB888)
+    q_img.ndarray = rgb
+    return q_img
@@ -14,7 +14,6 @@ import platform
 
 # import gc
 import psutil
-from memory_profiler import profile
 import pygetwindow as gw
 
 import numpy as np
@@ -65,7 +64,10 @@ def os_specific_task(os_name):
 
 class WindowProcessHandler():
     
-    __slot__ = ['hwnd','window_process']
+    __slot__ = ['hwnd','window_process','capture_region']
+    
+    # 마우스/키보드는 하나뿐이므로 여러 세션이 동시에 입력하지 않도록 공유
+    input_lock = threading.Lock()
     
     def __init__(self):
         # # DPI 인식 활성화
@@ -75,10 +77,15 @@ class WindowProcessHandler():
         
         self.hwnd = None
         self.window_process = None
+        # (left, top, width, height), None 이면 모니터 전체 캡쳐
+        self.capture_region = None
     
     def caputer_monitor_to_cv_img(self):
         with mss.mss() as sct:
             monitor = sct.monitors[1]
+            if self.capture_region is not None:
+                left, top, width, height = self.capture_region
+                monitor = {'left': left, 'top': top, 'width': width, 'height': height}
             screenshot = sct.grab(monitor) # screenshot 
             image = np.array(screenshot)
             image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
@@ -134,6 +141,33 @@ class WindowProcessHandler():
         print(message)
         return message
 
+    # 같은 이름으로 실행중인 모든 프로세스 찾기 (다중 클라이언트)
+    def find_processes_by_name(self, process_name):
+        return [proc for proc in psutil.process_iter(['pid', 'name']) if proc.info['name'] == process_name]
+
+    def connect_application_by_pid(self, pid):
+        self.hwnd, self.window_process = self.find_hwnd_window_by_pid(pid)
+        if self.window_process:
+            self.window_process.activate()
+            message = f"PID {pid} : Window activated successfully!"
+        else:
+            message = f"PID {pid} : Window not found."
+        print(message)
+        return message
+
+    @os_specific_task("Windows")
+    def update_capture_region(self):
+        # 윈도우 영역을 캡쳐 영역으로 지정
+        left, top, right, bot = win32gui.GetWindowRect(self.hwnd)
+        self.capture_region = (left, top, right - left, bot - top)
+        return self.capture_region
+
+    def to_screen_coords(self, coords):
+        # 캡쳐 영역 기준 좌표를 모니터 좌표로 변환
+        if self.capture_region is None:
+            return coords
+        return (coords[0] + self.capture_region[0], coords[1] + self.capture_region[1])
+
     # 프로세스 ID를 기반으로 윈도우 찾기
     @os_specific_task("Windows")
     def find_hwnd_window_by_pid(self,pid):
@@ -167,18 +201,21 @@ class WindowProcessHandler():
     
     @os_specific_task("Windows")
     def mouseclick(self, button: str, coords: tuple):
+        coords = self.to_screen_coords(coords)
         def task():
         # self.window_process.set_focus()
-            self.window_process.activate()
-            mouse.click(button=button, coords=coords)
+            with self.input_lock:
+                self.window_process.activate()
+                mouse.click(button=button, coords=coords)
         threading.Thread(target=task).start()
     
     @os_specific_task("Windows")
     def sendkey(self, key: str):
         def task():
         # self.window_process.set_focus()
-            self.window_process.activate()
-            keyboard.send_keys(key)
+            with self.input_lock:
+                self.window_process.activate()
+                keyboard.send_keys(key)
         threading.Thread(target=task).start()
     
     @os_specific_task("Windows")
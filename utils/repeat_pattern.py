@@ -2,6 +2,7 @@
 
 import numpy as np
 import re
+import time
 
 from PyQt5.QtCore import QThread, Qt, pyqtSignal
 
@@ -11,6 +12,7 @@ class ItemType(Enum):
     TYPING = 1
     REMATCH = 2
     DELAY = 3
+    OCR_CLICK = 4 # 템플릿 이미지 없이 화면의 텍스트 라벨을 찾아 클릭
 
 class StrEnum(str, Enum):
     def _generate_next_value_(name, start, count, last_values):
@@ -49,6 +51,9 @@ class RepeatPattern(QThread):
         self.handler = None
         # self.matcher = None
         self.delay = 0.8
+        # True 이면 headless 실행 ( utils.scenario_runner ) : TYPING 키 입력 / 소수 DELAY 허용
+        # GUI 에서 저장된 기존 시퀀스는 TYPING 을 실행하지 않음 ( 게임 창에 키 입력이 가지 않도록 )
+        self.headless = False
         
         pattern = r"quit|back"
         none_esc_patter = r"arrow|back"
@@ -56,6 +61,25 @@ class RepeatPattern(QThread):
         # pattern = re.escape(string) # 특정 문자열을 정규 표현식 패턴으로 변환
         self.compiled_esc_pattern = re.compile(none_esc_patter)
         self.actions_list = []
+        
+        # 동작 단위 결과 기록 ( utils.result_writer.ResultWriter )
+        self.result_writer = None
+        self.capture_ms = None
+        # 직전 동작 실패 여부 ( 1 이면 실패, record_result 에서 error 로 기록 )
+        self.step_error = 0
+        
+        # OCR_CLICK 용 화면 텍스트 색인 ( utils.ocr_index.OCRTextIndex, 없으면 처음 사용할 때 생성 )
+        self.text_index = None
+        # text_index 를 새로 만들 때 사용할 OCR backend ( "keras" | "glyph" )
+        self.ocr_backend = "keras"
+    
+    def set_ocr_backend(self, backend):
+        # text_index 를 만들어서 backend 검사 ( glyph atlas 가 비어있으면 RuntimeError )
+        if self.text_index is None:
+            from utils.ocr_index import OCRTextIndex
+            self.text_index = OCRTextIndex(backend=self.ocr_backend)
+        self.text_index.set_backend(backend)
+        self.ocr_backend = backend
     
     def receive_items(self, items):
         
@@ -93,8 +117,8 @@ class RepeatPattern(QThread):
         # print("receive_matcher 실행")
         self.matcher = matcher
     
-    def check_usable_esc(self,pre_frame, post_frame):
-        if not self.matcher.match_difference_frames(pre_frame,post_frame):
+    def check_usable_esc(self,pre_frame, post_frame, pre_thumb=None):
+        if not self.matcher.detect_frame_change(pre_frame,post_frame,pre_thumb):
             print(f"{SendKey.ESC.name} isn't work")
             return
         
@@ -102,6 +126,76 @@ class RepeatPattern(QThread):
         self.handler.sendkey(SendKey.ESC.value)
     
     
+    def execute_item(self, data):
+        '''
+            단일 동작 실행
+            REMATCH 의 경우 하위 폴더 탐색이 필요하므로 이미지 이름을 반환
+        '''
+        ptype = data[0]
+        dinfo = data[1]
+        self.capture_ms = None
+        self.step_error = 0
+        if ptype == ItemType.CLICK: # GUI 설정에 주료 활용
+            ''' 
+                GUI 설정에 주로 활용
+                다른 게임 타겟시, 활용방법 고민예정
+            '''
+            img = dinfo[0]
+            coord = dinfo[1]
+            print(f"{ptype}, {img}")
+            self.actions_list.append(data)
+            # self.msleep(int(500*self.delay))
+            capture_start = time.perf_counter()
+            pre_frame = self.handler.caputer_monitor_to_cv_img()
+            self.capture_ms = (time.perf_counter() - capture_start) * 1000
+            pre_thumb = self.matcher.make_thumbnail(pre_frame) # 클릭 전 프레임 썸네일 재사용
+            self.handler.mouseclick('left',coord)
+            self.msleep(int(1500*self.delay))
+            capture_start = time.perf_counter()
+            post_frame = self.handler.caputer_monitor_to_cv_img()
+            self.capture_ms += (time.perf_counter() - capture_start) * 1000
+            search = self.compiled_esc_pattern.search(img)
+            if not search:
+                self.check_usable_esc(pre_frame,post_frame,pre_thumb)
+            self.msleep(int(800*self.delay))
+        elif ptype == ItemType.TYPING:
+            self.actions_list.append(data)
+            if self.headless:
+                self.handler.sendkey(dinfo[0])
+        elif ptype == ItemType.REMATCH:
+            img = dinfo[0]
+            coord = dinfo[1]
+            self.handler.mouseclick('left',coord)
+            print(f"{ptype}, {img}")
+            self.actions_list.append(data)
+            return img
+        elif ptype == ItemType.DELAY:
+            self.delay = float(dinfo[0]) if self.headless else int(dinfo[0])
+        elif ptype == ItemType.OCR_CLICK:
+            label = dinfo[0]
+            capture_start = time.perf_counter()
+            frame = self.handler.caputer_monitor_to_cv_img()
+            self.capture_ms = (time.perf_counter() - capture_start) * 1000
+            coord = self.find_text(frame, label)
+            print(f"{ptype}, {label}, {coord}")
+            if coord is None:
+                print(f"'{label}' 텍스트를 찾지 못했습니다.")
+                self.step_error = 1
+                return None
+            self.actions_list.append(data)
+            self.handler.mouseclick('left',coord)
+            self.msleep(int(800*self.delay))
+        return None
+    
+    def find_text(self, frame, label):
+        if self.text_index is None:
+            from utils.ocr_index import OCRTextIndex
+            self.text_index = OCRTextIndex(backend=self.ocr_backend)
+        # 이전 단계와 같은 텍스트 영역은 OCR 결과 재사용
+        self.text_index.update(frame)
+        print(self.text_index.report())
+        return self.text_index.find_center(label)
+    
     def run(self): # ctrl+esc 로 종료 메시지
 
         
@@ -120,42 +214,20 @@ class RepeatPattern(QThread):
                 break
             
             if data:
-                ptype = data[0]
-                dinfo = data[1]
-                if ptype == ItemType.CLICK: # GUI 설정에 주료 활용
-                    ''' 
-                        GUI 설정에 주로 활용
-                        다른 게임 타겟시, 활용방법 고민예정
-                    '''
-                    img = dinfo[0]
-                    coord = dinfo[1]
-                    print(f"{ptype}, {img}")
-                    self.actions_list.append(data)
-                    # self.msleep(int(500*self.delay))
-                    pre_frame = self.handler.caputer_monitor_to_cv_img()
-                    self.handler.mouseclick('left',coord)
-                    self.msleep(int(1500*self.delay))
-                    post_frame = self.handler.caputer_monitor_to_cv_img()
-                    search = self.compiled_esc_pattern.search(img)
-                    if not search:
-                        self.check_usable_esc(pre_frame,post_frame)
-                    self.msleep(int(800*self.delay))
-                elif ptype == ItemType.TYPING:
-                    # self.handler.sendkey(SendKey.ESC.value)
-                    pass
-                elif ptype == ItemType.REMATCH:
-                    img = dinfo[0]
-                    coord = dinfo[1]
-                    self.handler.mouseclick('left',coord)
-                    print(f"{ptype}, {img}")
-                    self.actions_list.append(data)
-                    self.subfolder.emit(img)
+                step_start = time.perf_counter()
+                subfolder = self.execute_item(data)
+                self.record_result(data, (time.perf_counter() - step_start) * 1000)
+                if subfolder is not None:
+                    self.subfolder.emit(subfolder)
                     break
-                elif ptype == ItemType.DELAY:
-                    self.delay = int(dinfo[0])
             # print(f"Items : {len(self.items)}")        
         # print(f"Stop run. Items : {len(self.items)}")
 
+    def record_result(self, data, latency_ms):
+        if self.result_writer is None:
+            return
+        self.result_writer.write_action(data[0], data[1], latency_ms, self.capture_ms, error=self.step_error)
+
     def stop(self):
         self.running = False
         print(f"Stop repeat")
@@ -0,0 +1,90 @@
+import os, json, time, datetime
+import threading
+
+'''
+ 루틴 실행 결과를 동작 단위로 바로 기록하는 writer
+ - 동작이 끝날 때마다 JSONL 한 줄씩 추가 ( 중간에 종료되어도 기록 유지 )
+ - 루틴 종료 후 필요하면 Excel / Parquet 으로 변환
+'''
+
+class ResultWriter():
+
+    __slot__ = ['path','scenario','file','step','start_time','lock']
+
+    def __init__(self, path=None, scenario="pre-set0"):
+        if path is None:
+            current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = f"action_items_{current_time}.jsonl"
+        self.path = path
+        self.scenario = scenario
+        self.file = None
+        self.step = 0
+        self.start_time = None
+        self.lock = threading.Lock()
+
+    def open(self):
+        # line buffering 으로 한 줄마다 디스크에 반영
+        self.file = open(self.path, 'a', encoding='utf-8', buffering=1)
+        self.start_time = time.time()
+        return self
+
+    def write_action(self, ptype, dinfo, latency_ms, capture_ms=None, error=0):
+        coord = dinfo[1] if len(dinfo) > 1 and isinstance(dinfo[1], (list, tuple)) else None
+        score = dinfo[2] if len(dinfo) > 2 else None
+        record = {
+            'time': round(time.time(), 3),
+            'scenario': self.scenario,
+            'step': self.step,
+            'action': ptype.name,
+            'name': str(dinfo[0]) if len(dinfo) > 0 else "",
+            'x': None if coord is None else int(coord[0]),
+            'y': None if coord is None else int(coord[1]),
+            'score': None if score is None else round(float(score), 4),
+            'latency_ms': round(latency_ms, 3),
+            'capture_ms': None if capture_ms is None else round(capture_ms, 3),
+            'error': error,
+        }
+        self.write(record)
+
+    def write(self, record):
+        with self.lock:
+            if self.file is None:
+                self.open()
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.step += 1
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def read(self):
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    def export(self, filename=None, fmt="xlsx"):
+        # 루틴 종료 후 변환 (pandas 는 export 시에만 사용)
+        import pandas as pd
+
+        records = self.read()
+        df = pd.DataFrame(records, columns=["scenario", "step", "action", "name", "x", "y", "score", "latency_ms", "capture_ms", "error", "time"])
+        # 전체 실행 시간은 첫 행에만 기록
+        total_time = "" if self.start_time is None else time.time() - self.start_time
+        df["RunTime"] = [total_time if idx == 0 else "" for idx in range(len(df))]
+
+        if filename is None:
+            filename = os.path.splitext(self.path)[0] + f".{fmt}"
+        if fmt == "parquet":
+            df.to_parquet(filename, index=False)
+        else:
+            df.to_excel(filename, index=False)
+        print(f"Data has been saved to {filename}")
+        return filename
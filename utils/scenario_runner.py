@@ -0,0 +1,295 @@
+import os, sys, json, time, re
+import threading
+import argparse
+
+import cv2
+
+from utils.process_handler import WindowProcessHandler
+from utils.repeat_pattern import RepeatPattern, ItemType
+from utils.template_matcher import UITemplateMatcher, get_all_images, get_subfolders
+from utils.ui_graph import UINavigationGraph
+from utils.ocr_finder import OCR_BACKENDS
+
+'''
+ GUI 이벤트 루프 없이 시나리오 파일을 실행하는 러너
+ python -m utils.scenario_runner scenario_a.json scenario_b.json --trace trace.jsonl
+
+ 시나리오 파일 예시 (items 는 action_sequence 의 Item 데이터와 동일한 형태)
+ {
+     "name": "open_options",
+     "process": "GeometryDash.exe",
+     "gui_root": "screen/UI",
+     "delay": 0.8,
+     "target": "select_options",    ( 선택, --graph 사용시 해당 화면으로 바로 이동 후 실행 )
+     "ocr_backend": "glyph",        ( 선택, OCR_CLICK 인식 backend : keras | glyph )
+     "items": [
+         ["CLICK", ["select_options", [1280, 720]]],
+         ["REMATCH", ["select_options", [1280, 720]]],
+         ["TYPING", ["{ESC}"]],          ( headless 실행에서만 키 입력, GUI 에서는 기록만 )
+         ["OCR_CLICK", ["Create"]],      ( 템플릿 이미지 없이 화면의 텍스트 라벨 클릭 )
+         ["DELAY", ["1"]]
+     ]
+ }
+'''
+
+def load_scenario(path):
+    with open(path, 'r', encoding='utf-8') as json_file:
+        scenario = json.load(json_file)
+
+    scenario.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    # 문자열 타입을 ItemType 으로 변환
+    scenario['items'] = [[ItemType[ptype], dinfo] for ptype, dinfo in scenario.get('items', [])]
+    return scenario
+
+def load_gui_templates(img_files):
+    # mainWindow.make_gui_template 과 동일한 형태의 템플릿 목록
+    templates = []
+    for file in img_files:
+        name = file.split('.')[0]
+        template = {}
+        template[name] = cv2.imread(file, cv2.IMREAD_GRAYSCALE)
+        templates.append(template)
+    return templates
+
+class TemplateBank():
+    
+    __slot__ = ['templates','lock']
+    
+    # 폴더별 GUI 템플릿을 한번만 읽어서 여러 러너/세션이 공유
+    def __init__(self):
+        self.templates = {}
+        self.lock = threading.Lock()
+    
+    def get(self, folder):
+        with self.lock:
+            if folder not in self.templates:
+                self.templates[folder] = load_gui_templates(get_all_images(folder))
+            # UITemplateMatcher.run 이 목록을 소비하므로 복사본 전달
+            return list(self.templates[folder])
+
+def make_items_from_matches(matches, sub_folders):
+    items = []
+    for loc, scale, score, template_tuple in matches:
+        name = os.path.basename(template_tuple[0].replace('\\', '/'))
+        h, w = template_tuple[1].shape[:2] # 중심좌표
+        mc_loc = [loc[0] + int(w * scale * 0.5), loc[1] + int(h * scale * 0.5)]
+
+        # 하위 폴더가 존재하는 GUI 는 REMATCH 로 등록
+        pattern = re.escape(name)
+        is_match = any(re.search(pattern, sub_folder) for sub_folder in sub_folders)
+        ptype = ItemType.REMATCH if is_match else ItemType.CLICK
+        # scale 은 그래프에 저장된 화면을 다시 확인할 때 사용 ( verify_items )
+        items.append([ptype, [name, mc_loc, float(score), float(scale)]])
+    return items
+
+def verify_items(image, templates, items, threshold=0.8, tolerance=0.25):
+    # 그래프에 저장된 화면이 지금도 맞는지 가장 점수가 높은 템플릿 하나만 저장된 위치 주변에서 확인
+    # ( 창 이동 / 크기 변경 / 다른 화면이면 False -> 전체 매칭 )
+    candidates = [dinfo for _, dinfo in items if len(dinfo) > 3]
+    if len(candidates) < 1:
+        return False
+    name, coord, _, scale = max(candidates, key=lambda dinfo: dinfo[2])[:4]
+    template = None
+    for template_dict in templates:
+        for key, value in template_dict.items():
+            if os.path.basename(key.replace('\\', '/')) == name:
+                template = value
+    if template is None:
+        return False
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    resized = cv2.resize(template, (0, 0), fx=scale, fy=scale)
+    th, tw = resized.shape[:2]
+    if th < 1 or tw < 1:
+        return False
+    # 저장된 중심 좌표 주변 ( 템플릿 크기만큼 여유 ) 에서만 검색
+    x0, y0 = max(int(coord[0] - tw), 0), max(int(coord[1] - th), 0)
+    x1, y1 = min(int(coord[0] + tw), gray.shape[1]), min(int(coord[1] + th), gray.shape[0])
+    window = gray[y0:y1, x0:x1]
+    if window.shape[0] < th or window.shape[1] < tw:
+        return False
+    result = cv2.matchTemplate(window, resized, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    cx, cy = x0 + max_loc[0] + tw * 0.5, y0 + max_loc[1] + th * 0.5
+    moved = abs(cx - coord[0]) > tw * tolerance or abs(cy - coord[1]) > th * tolerance
+    return max_val >= threshold and not moved
+
+class ScenarioRunner():
+
+    __slot__ = ['handler','matcher','repeater','gui_root','template_bank','graph','current_state','trace','ocr_backend']
+
+    def __init__(self, handler=None, matcher=None, gui_root="screen/UI", template_bank=None, graph=None, ocr_backend="keras"):
+        self.handler = handler if handler is not None else WindowProcessHandler()
+        self.matcher = matcher if matcher is not None else UITemplateMatcher(scale_range=(0.02, 0.7, 0.02))
+        self.template_bank = template_bank if template_bank is not None else TemplateBank()
+
+        # GUI 와 동일한 RepeatPattern 의 동작 실행부를 사용 (QThread 는 시작하지 않음)
+        self.repeater = RepeatPattern()
+        self.repeater.headless = True
+        self.repeater.receive_handler(self.handler)
+        self.repeater.receive_matcher(self.matcher)
+        self.ocr_backend = ocr_backend
+
+        self.gui_root = gui_root
+        # GUI 이동 그래프 ( None 이면 매번 매칭 )
+        self.graph = graph
+        self.current_state = None
+        self.trace = []
+
+    def connect(self, process_name):
+        if self.handler.window_process is None:
+            msg = self.handler.connect_application_by_process_name(process_name)
+            print(msg)
+        return self.handler.window_process is not None
+
+    def rematch(self, folder):
+        templates = self.template_bank.get(folder)
+        if len(templates) < 1:
+            print(f"Path :'{folder}' 내에 이미지 파일이 없습니다.")
+            return []
+
+        image = self.handler.caputer_monitor_to_cv_img()
+        if self.graph is not None:
+            items = self.graph.cached_items(folder)
+            # 알고 있는 화면은 템플릿 하나만 확인하고 전체 매칭 생략
+            if items is not None and verify_items(image, templates, items, self.matcher.threshold):
+                self.current_state = self.graph.state_of_folder(folder)
+                return items
+
+        self.matcher.update_scale_range(image.shape[1])
+        self.matcher.update_img_datas(image, templates)
+        self.matcher.run() # 이벤트 루프 없이 현재 스레드에서 매칭
+
+        sub_folders = [os.path.basename(f) for f in get_subfolders(folder)]
+        items = make_items_from_matches(self.matcher.matches, sub_folders)
+        if self.graph is not None:
+            # 아무것도 매칭되지 않으면 현재 화면을 알 수 없음
+            self.current_state = self.graph.add_state(folder, items) if len(items) > 0 else None
+        return items
+
+    def navigate_to(self, target):
+        # 그래프 상의 최단 클릭 경로로 목표 화면까지 이동
+        dst = self.graph.find_target_state(target)
+        path = None if dst is None else self.graph.find_path(self.current_state, dst)
+        if path is None:
+            print(f"'{target}' 화면까지의 경로를 알 수 없습니다.")
+            return False
+
+        for name, edge in path:
+            print(f"Navigate : {name}")
+            self.handler.mouseclick('left', edge['coord'])
+            self.repeater.msleep(int(1500*self.repeater.delay))
+            self.current_state = edge['to']
+        return True
+
+    def run(self, scenario):
+        self.trace = []
+        gui_root = scenario.get('gui_root', self.gui_root)
+
+        # 시나리오 파일의 순서대로 실행되도록 역순으로 적재 ( RepeatPattern 은 뒤에서부터 pop )
+        self.repeater.items = list(reversed(scenario['items']))
+        self.repeater.actions_list = []
+        self.repeater.delay = float(scenario.get('delay', 0.8))
+        self.repeater.set_ocr_backend(scenario.get('ocr_backend', self.ocr_backend))
+        self.repeater.running = True
+
+        # 시나리오는 로비(gui_root) 화면에서 시작한다고 가정
+        self.current_state = None
+        if self.graph is not None:
+            # 로비 화면을 처음 보는 경우 한번만 매칭해서 그래프의 시작 state 로 등록
+            self.rematch(gui_root)
+
+        start_time = time.perf_counter()
+        step = 0
+        target = scenario.get('target')
+        if self.graph is not None and target:
+            nav_start = time.perf_counter()
+            reached = self.navigate_to(target)
+            self.trace.append({
+                'scenario': scenario['name'],
+                'step': step,
+                'type': "NAVIGATE",
+                'name': target,
+                'coord': None,
+                'start_ms': 0.0,
+                'latency_ms': round((time.perf_counter() - nav_start) * 1000, 3),
+                'rematch_ms': None,
+                'reached': reached,
+            })
+            step += 1
+            if not reached:
+                self.repeater.items = []
+
+        while self.repeater.running and len(self.repeater.items) > 0:
+            data = self.repeater.items.pop(-1)
+
+            step_start = time.perf_counter()
+            subfolder = self.repeater.execute_item(data)
+            action_ms = (time.perf_counter() - step_start) * 1000
+            self.repeater.record_result(data, action_ms)
+
+            rematch_ms = None
+            if subfolder is not None:
+                rematch_start = time.perf_counter()
+                src_state = self.current_state
+                items = self.rematch(os.path.join(gui_root, subfolder))
+                if self.graph is not None and len(items) > 0:
+                    self.graph.add_edge(src_state, subfolder, data[0], data[1][1], self.current_state)
+                self.repeater.receive_items(items)
+                rematch_ms = (time.perf_counter() - rematch_start) * 1000
+
+            dinfo = data[1]
+            record = {
+                'scenario': scenario['name'],
+                'step': step,
+                'type': data[0].name,
+                'name': dinfo[0] if len(dinfo) > 0 else "",
+                'coord': dinfo[1] if len(dinfo) > 1 else None,
+                'start_ms': round((step_start - start_time) * 1000, 3),
+                'latency_ms': round(action_ms, 3),
+                'rematch_ms': None if rematch_ms is None else round(rematch_ms, 3),
+                'error': self.repeater.step_error,
+            }
+            self.trace.append(record)
+            step += 1
+
+        self.repeater.running = False
+        if self.graph is not None:
+            self.graph.save()
+        return self.trace
+
+def write_trace(path, trace):
+    # 시나리오 단위로 JSONL 에 이어쓰기
+    with open(path, 'a', encoding='utf-8') as trace_file:
+        for record in trace:
+            trace_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoQA headless scenario runner")
+    parser.add_argument('scenarios', nargs='+', help="시나리오 JSON 파일 경로")
+    parser.add_argument('--process', default="GeometryDash.exe", help="대상 프로세스 이름")
+    parser.add_argument('--gui-root', default="screen/UI", help="GUI 템플릿 루트 폴더")
+    parser.add_argument('--trace', default="scenario_trace.jsonl", help="타이밍 trace 출력 파일 (JSONL)")
+    parser.add_argument('--graph', default=None, help="GUI 이동 그래프 파일 (ex. screen/ui_graph.json)")
+    parser.add_argument('--ocr-backend', default="keras", choices=OCR_BACKENDS, help="OCR_CLICK 인식 backend ( 시나리오의 ocr_backend 가 우선 )")
+    args = parser.parse_args(argv)
+
+    graph = None if args.graph is None else UINavigationGraph(args.graph)
+    runner = ScenarioRunner(gui_root=args.gui_root, graph=graph, ocr_backend=args.ocr_backend)
+    failed = 0
+    for path in args.scenarios:
+        scenario = load_scenario(path)
+        if not runner.connect(scenario.get('process', args.process)):
+            print(f"{scenario['name']} : 프로세스에 연결하지 못했습니다.")
+            failed += 1
+            continue
+
+        trace = runner.run(scenario)
+        write_trace(args.trace, trace)
+        total_ms = sum(r['latency_ms'] + (r['rematch_ms'] or 0) for r in trace)
+        print(f"{scenario['name']} : {len(trace)} steps, {total_ms:.1f} ms")
+
+    return 1 if failed > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
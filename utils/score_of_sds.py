@@ -3,7 +3,6 @@ from scipy.spatial.distance import cdist
 from concurrent.futures import ThreadPoolExecutor,ProcessPoolExecutor, as_completed
 from threading import Semaphore
 
-from memory_profiler import profile
 from tqdm import tqdm
 import time
 
@@ -0,0 +1,131 @@
+import sys, time
+import threading
+import queue
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.process_handler import WindowProcessHandler
+from utils.template_matcher import UITemplateMatcher
+from utils.scenario_runner import ScenarioRunner, TemplateBank, load_scenario, write_trace
+from utils.ui_graph import UINavigationGraph
+
+'''
+ 여러 게임 클라이언트 창에 대해 시나리오를 동시에 실행하는 스케줄러
+ python -m utils.session_scheduler scenario_a.json scenario_b.json --instances 4 --trace trace.jsonl
+'''
+
+class SessionScheduler():
+
+    __slot__ = ['gui_root','sessions','template_bank','worker_pool','graph','lock','traces']
+
+    def __init__(self, gui_root="screen/UI", max_match_workers=8, graph=None):
+        self.gui_root = gui_root
+        self.sessions = []
+        # 모든 세션이 템플릿과 매칭 스레드를 공유
+        self.template_bank = TemplateBank()
+        self.worker_pool = ThreadPoolExecutor(max_workers=max_match_workers)
+        self.graph = graph
+        self.lock = threading.Lock()
+        self.traces = []
+
+    def add_session(self, pid=None, capture_region=None):
+        handler = WindowProcessHandler()
+        if pid is not None:
+            handler.connect_application_by_pid(pid)
+            if handler.window_process is None:
+                return None
+
+        # 캡쳐 영역을 지정하지 않으면 윈도우 영역을 사용
+        if capture_region is not None:
+            handler.capture_region = tuple(capture_region)
+        elif handler.hwnd is not None:
+            handler.update_capture_region()
+
+        matcher = UITemplateMatcher(scale_range=(0.02, 0.7, 0.02), worker_pool=self.worker_pool)
+        runner = ScenarioRunner(handler, matcher, self.gui_root, self.template_bank, self.graph)
+        self.sessions.append(runner)
+        return runner
+
+    def add_sessions_by_process_name(self, process_name, instances=None):
+        procs = WindowProcessHandler().find_processes_by_name(process_name)
+        if instances is not None:
+            procs = procs[:instances]
+        for proc in procs:
+            self.add_session(pid=proc.info['pid'])
+        return len(self.sessions)
+
+    def worker(self, session_id, runner, scenarios):
+        while True:
+            try:
+                scenario = scenarios.get_nowait()
+            except queue.Empty:
+                return
+
+            trace = runner.run(scenario)
+            for record in trace:
+                record['session'] = session_id
+            with self.lock:
+                self.traces.extend(trace)
+
+    def run(self, scenarios):
+        # 세션마다 스레드 하나, 남은 시나리오를 큐에서 가져와 실행
+        scenario_queue = queue.Queue()
+        for scenario in scenarios:
+            scenario_queue.put(scenario)
+
+        self.traces = []
+        threads = []
+        start_time = time.perf_counter()
+        for session_id, runner in enumerate(self.sessions):
+            thread = threading.Thread(target=self.worker, args=(session_id, runner, scenario_queue))
+            threads.append(thread)
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start_time
+        print(f"{len(scenarios)} scenarios / {len(self.sessions)} sessions : {elapsed:.2f} s")
+        return self.traces
+
+    def close(self):
+        self.worker_pool.shutdown(wait=True)
+
+def parse_region(text):
+    return [int(v) for v in text.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoQA multi-instance scenario scheduler")
+    parser.add_argument('scenarios', nargs='+', help="시나리오 JSON 파일 경로")
+    parser.add_argument('--process', default="GeometryDash.exe", help="대상 프로세스 이름")
+    parser.add_argument('--instances', type=int, default=None, help="사용할 클라이언트 수 (기본: 실행중인 전체)")
+    parser.add_argument('--pids', type=int, nargs='*', default=None, help="세션으로 사용할 프로세스 PID 목록")
+    parser.add_argument('--regions', type=parse_region, nargs='*', default=None, help="세션별 캡쳐 영역 left,top,width,height")
+    parser.add_argument('--gui-root', default="screen/UI", help="GUI 템플릿 루트 폴더")
+    parser.add_argument('--match-workers', type=int, default=8, help="세션 공유 매칭 스레드 수")
+    parser.add_argument('--trace', default="scenario_trace.jsonl", help="타이밍 trace 출력 파일 (JSONL)")
+    parser.add_argument('--graph', default=None, help="GUI 이동 그래프 파일 (ex. screen/ui_graph.json)")
+    args = parser.parse_args(argv)
+
+    graph = None if args.graph is None else UINavigationGraph(args.graph)
+    scheduler = SessionScheduler(args.gui_root, args.match_workers, graph)
+    if args.pids:
+        regions = args.regions or [None] * len(args.pids)
+        for pid, region in zip(args.pids, regions):
+            scheduler.add_session(pid=pid, capture_region=region)
+    else:
+        scheduler.add_sessions_by_process_name(args.process, args.instances)
+
+    if len(scheduler.sessions) < 1:
+        print(f"'{args.process}' 연결 가능한 클라이언트가 없습니다.")
+        return 1
+
+    scenarios = [load_scenario(path) for path in args.scenarios]
+    traces = scheduler.run(scenarios)
+    write_trace(args.trace, traces)
+    scheduler.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
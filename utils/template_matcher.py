@@ -2,16 +2,22 @@ import cv2
 import numpy as np
 import threading
 
-import matplotlib.pyplot as plt
 
 import os
 import glob
+import time
 from tqdm import tqdm
 
 from PyQt5.QtWidgets import QApplication, QMainWindow, QStatusBar
 from PyQt5.QtCore import pyqtSignal, QThread
 
-from utils.score_of_sds import find_best_match,resize_image
+from utils.lazy_import import lazy_import
+from utils.overlay_renderer import OverlayRenderer
+from utils.image_writer import get_image_writer
+
+# scipy / matplotlib 은 실제 사용할 때 로드
+score_of_sds = lazy_import("utils.score_of_sds")
+plt = lazy_import("matplotlib.pyplot")
 
 from concurrent.futures import ThreadPoolExecutor,ProcessPoolExecutor, as_completed
 from threading import Semaphore
@@ -42,7 +48,7 @@ class UITemplateMatcher(QThread):
     __slot__ = ['frame','templates','scale_range','threshold','lock']
     
     # def __init__(self, frame, templates, scale_range, threshold=0.8):
-    def __init__(self, scale_range, threshold=0.8):
+    def __init__(self, scale_range, threshold=0.8, worker_pool=None):
         super().__init__()
         # self.frame = frame
         # self.templates = templates
@@ -58,11 +64,33 @@ class UITemplateMatcher(QThread):
         # self.gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         self.iter = 0
+        
+        # 여러 세션이 공유하는 ThreadPoolExecutor ( None 이면 매칭마다 스레드 생성 )
+        self.worker_pool = worker_pool
+        
+        # 화면 변화 감지 설정 ( "thumbnail" : 축소 이미지 우선 비교, "full" : 원본 해상도 비교 )
+        self.change_mode = "thumbnail"
+        self.thumb_size = (160, 90)
+        self.thumb_diff_threshold = 15
+        # ( 변화 없음 상한, 변화 확정 하한 ) - 변화된 픽셀 비율, 사이 구간은 원본 해상도로 재확인
+        self.change_sensitivity = (0.0005, 0.01)
+        
+        # 매칭 결과 미리보기 ( 축소 버퍼 재사용 )
+        self.renderer = OverlayRenderer()
     
     def update_img_datas(self, frame, templates):
         self.frame = frame
         self.gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         self.templates = templates
+    
+    def update_scale_range(self, width):
+        # 캡쳐 해상도(너비)에 따른 scale range 조정
+        if width > 2048 and width < 2560:
+            self.scale_range=(0.5, 1.2, 0.1)
+        elif width < 2048:
+            self.scale_range=(0.2, 0.7, 0.02)
+        else:
+            self.scale_range=(0.8, 2.0, 0.1)
         
     
     def match_difference_frames(self, src, des):
@@ -91,6 +119,47 @@ class UITemplateMatcher(QThread):
 
         return is_diff
     
+    def make_thumbnail(self, frame):
+        # 축소 후 그레이스케일 변환 ( 원본 해상도 변환 비용 제거 )
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        return thumb
+    
+    def match_difference_thumbnails(self, src, des, src_thumb=None):
+        """
+        축소 이미지로 두 프레임의 변화 여부를 판단합니다.
+        
+        :param src: 이전 프레임 (BGR)
+        :param des: 이후 프레임 (BGR)
+        :param src_thumb: 이미 만들어 둔 이전 프레임의 썸네일 (없으면 새로 생성)
+        :return: True (변화 있음), False (변화 없음), None (판단 모호)
+        """
+        if src_thumb is None:
+            src_thumb = self.make_thumbnail(src)
+        des_thumb = self.make_thumbnail(des)
+        
+        diff = cv2.absdiff(src_thumb, des_thumb)
+        _, thresh = cv2.threshold(diff, self.thumb_diff_threshold, 255, cv2.THRESH_BINARY)
+        ratio = cv2.countNonZero(thresh) / thresh.size
+        
+        low, high = self.change_sensitivity
+        if ratio < low:
+            return False
+        if ratio > high:
+            return True
+        return None
+    
+    def detect_frame_change(self, src, des, src_thumb=None):
+        if self.change_mode == "full":
+            return self.match_difference_frames(src, des)
+        
+        is_diff = self.match_difference_thumbnails(src, des, src_thumb)
+        if is_diff is None:
+            # 썸네일로 판단이 모호할 때만 원본 해상도로 비교
+            return self.match_difference_frames(src, des)
+        return is_diff
+    
     def sds_multi_scale_template_matching(self,semaphore, template, pbar):
         with semaphore:
             # Dict 처리
@@ -109,7 +178,7 @@ class UITemplateMatcher(QThread):
                 resized_template = cv2.resize(template_img, (0, 0), fx=scale, fy=scale)
                 window_size = resized_template.shape[:2]
                 stride = 10 # 10
-                best_score, best_loc, best_scale = find_best_match(resized_template,self.frame,window_size, stride,self.scale_range)
+                best_score, best_loc, best_scale = score_of_sds.find_best_match(resized_template,self.frame,window_size, stride,self.scale_range)
                 
                 pbar.update(1)  # 스레드 완료 시 진행 상황 업데이트
                 self.current_task += 1
@@ -190,6 +259,15 @@ class UITemplateMatcher(QThread):
         semaphore = threading.Semaphore(max_threads)
         
         with tqdm(total=self.total_tasks, desc="Matching templates") as pbar:
+            if self.worker_pool is not None:
+                # 공유 worker pool 로 세션 간 전체 매칭 스레드 수를 제한
+                futures = []
+                while len(self.templates) > 0:
+                    template = self.templates.pop(0)
+                    futures.append(self.worker_pool.submit(self.multi_scale_template_matching, semaphore, template, pbar))
+                for future in as_completed(futures):
+                    future.result()
+            
             while len(self.templates) > 0:
                 template = self.templates.pop(0)
                 thread = threading.Thread(target=self.multi_scale_template_matching, args=(semaphore,template, pbar))
@@ -208,18 +286,8 @@ class UITemplateMatcher(QThread):
         self.wait()
         
     def draw_matches(self, image):
-        # print(f"len self.matches : {self.matches} ,{len(self.matches)}")
-        for i,(loc, scale, score, template) in enumerate(self.matches):
-            print(f"{loc}")
-            top_left = loc
-            bottom_right = (top_left[0] + int(template[1].shape[1] * scale), top_left[1] + int(template[1].shape[0] * scale))
-            
-            name = template[0].split("\\")[-1]
-            cv2.rectangle(image, top_left, bottom_right, (0, 255, 0), 4)
-            # cv2.putText(image, f'{score:.2f}', (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 2)
-            cv2.putText(image, f'{name}', (top_left[0], bottom_right[1]+25), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
-            # cv2.imwrite(f"obs_result/{i}.jpg",image)
-        return image
+        # 원본 프레임은 그대로 두고 미리보기 크기 복사본에 그림 ( 이후 재매칭에 원본 사용 )
+        return self.renderer.draw_matches(image, self.matches)
         
 class TemplateMatcher:
     def __init__(self, template, scale_range, threshold=0.8):
@@ -546,7 +614,8 @@ class TemplateMatcher:
                 cv2.putText(image, f'{name} ,{score:.2f}', (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, font_size, color, int(2*font_size))
         
         path = f'lab_result/{self.lab_cnt}.jpg'
-        cv2.imwrite(path,image)
+        # 프레임마다 호출되므로 저장은 백그라운드 writer 에 맡김
+        get_image_writer().write(path,image)
         self.lab_cnt+=1
         return image
     
@@ -578,6 +647,29 @@ class TemplateMatcher:
         return image
 
 
+def benchmark_change_detection(size=(2560, 1440), repeat=20):
+    # 1440p 프레임에서 원본 해상도 비교와 썸네일 비교의 속도를 비교
+    matcher = UITemplateMatcher(scale_range=(0.5, 1.2, 0.1))
+    w, h = size
+    pre_frame = np.random.randint(0, 255, (h, w, 3), dtype=np.uint8)
+    same_frame = pre_frame.copy()
+    popup_frame = pre_frame.copy()
+    cv2.rectangle(popup_frame, (w // 4, h // 4), (w * 3 // 4, h * 3 // 4), (30, 30, 30), -1)
+    
+    results = {}
+    for name, post_frame in [("unchanged", same_frame), ("popup", popup_frame)]:
+        for mode in ["full", "thumbnail"]:
+            matcher.change_mode = mode
+            # RepeatPattern 과 동일하게 클릭 전 썸네일은 미리 만들어 재사용
+            pre_thumb = matcher.make_thumbnail(pre_frame) if mode == "thumbnail" else None
+            start = time.perf_counter()
+            for _ in range(repeat):
+                is_diff = matcher.detect_frame_change(pre_frame, post_frame, pre_thumb)
+            elapsed = (time.perf_counter() - start) / repeat * 1000
+            results[(name, mode)] = (elapsed, is_diff)
+            print(f"{name:>9} / {mode:>9} : {elapsed:.2f} ms, changed={is_diff}")
+    return results
+
 def main():
     # 사용 예제
     template = cv2.imread('target/b1.jpg', 0)
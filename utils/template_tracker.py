@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+
+'''
+ 프레임 간 템플릿 위치 추적
+ - 첫 프레임 / 추적 실패 / redetect_every 프레임마다 전체 화면 multi-scale 검색
+ - 그 외에는 이동 속도로 예측한 위치 주변 window 에서 직전 scale 근처만 검색
+   ( 프레임 해상도와 무관하게 템플릿 크기에 비례하는 비용 )
+
+ tracker = TemplateTracker(template, scale_range=(0.5, 0.8, 0.1), threshold=0.8)
+ result = tracker.update(gray_frame)   # (loc, scale, score) 또는 None
+'''
+
+class TemplateTracker():
+
+    __slot__ = ['template','scales','threshold','search_margin','redetect_every','scale_window','resized','loc','scale','velocity','since_detect','stats']
+
+    def __init__(self, template, scale_range=(0.5, 0.8, 0.1), threshold=0.8, search_margin=1.0, redetect_every=30, scale_window=1):
+        self.template = template
+        self.scales = list(np.arange(scale_range[0], scale_range[1], scale_range[2]))
+        self.threshold = threshold
+        # 예측 위치 주변 검색 범위 ( 템플릿 크기 대비 비율 )
+        self.search_margin = search_margin
+        self.redetect_every = redetect_every
+        # 추적 중에는 직전 scale 의 앞뒤 scale_window 단계만 검색
+        self.scale_window = scale_window
+        self.resized = {}   # scale index -> resized template ( 한번만 resize )
+        self.loc = None
+        self.scale = None   # scale index
+        self.velocity = (0, 0)
+        self.since_detect = 0
+        self.stats = {'detect': 0, 'track': 0, 'lost': 0}
+
+    def template_at(self, scale_idx):
+        if scale_idx not in self.resized:
+            scale = self.scales[scale_idx]
+            self.resized[scale_idx] = cv2.resize(self.template, (0, 0), fx=scale, fy=scale)
+        return self.resized[scale_idx]
+
+    def match(self, gray_frame, scale_indices, offset=(0, 0)):
+        best = None
+        for idx in scale_indices:
+            template = self.template_at(idx)
+            if template.shape[0] > gray_frame.shape[0] or template.shape[1] > gray_frame.shape[1]:
+                continue
+            result = cv2.matchTemplate(gray_frame, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if best is None or max_val > best[2]:
+                best = ((max_loc[0] + offset[0], max_loc[1] + offset[1]), idx, max_val)
+        return best
+
+    def detect(self, gray_frame):
+        self.stats['detect'] += 1
+        self.since_detect = 0
+        return self.match(gray_frame, range(len(self.scales)))
+
+    def track(self, gray_frame):
+        # 직전 위치 + 속도로 예측한 위치 주변만 잘라서 검색
+        self.stats['track'] += 1
+        self.since_detect += 1
+        th, tw = self.template_at(self.scale).shape[:2]
+        margin_x, margin_y = int(tw * self.search_margin), int(th * self.search_margin)
+        px, py = self.loc[0] + self.velocity[0], self.loc[1] + self.velocity[1]
+        h, w = gray_frame.shape[:2]
+        x0, y0 = max(px - margin_x, 0), max(py - margin_y, 0)
+        x1, y1 = min(px + tw + margin_x, w), min(py + th + margin_y, h)
+        window = gray_frame[y0:y1, x0:x1]
+        lo, hi = max(self.scale - self.scale_window, 0), min(self.scale + self.scale_window, len(self.scales) - 1)
+        return self.match(window, range(lo, hi + 1), (x0, y0))
+
+    def update(self, gray_frame):
+        result = None
+        if self.loc is not None and self.since_detect < self.redetect_every:
+            result = self.track(gray_frame)
+            if result is None or result[2] < self.threshold:
+                # 추적 실패시 전체 화면에서 다시 검색
+                self.stats['lost'] += 1
+                result = None
+        if result is None:
+            result = self.detect(gray_frame)
+
+        if result is None or result[2] < self.threshold:
+            self.loc = None
+            self.velocity = (0, 0)
+            return None
+
+        loc, scale_idx, score = result
+        if self.loc is not None:
+            self.velocity = (loc[0] - self.loc[0], loc[1] - self.loc[1])
+        self.loc = loc
+        self.scale = scale_idx
+        return loc, self.scales[scale_idx], score
+
+    def report(self):
+        stats = self.stats
+        return f"Tracker : {stats['track']} tracked, {stats['detect']} full detections, {stats['lost']} lost"
@@ -0,0 +1,100 @@
+import os, json
+import threading
+from collections import deque
+
+from utils.repeat_pattern import ItemType
+
+'''
+ 이전 실행 결과로 만든 GUI 이동 그래프
+ - state : 폴더 + 한 화면에서 매칭된 템플릿 이름 집합
+ - edge  : state 에서 템플릿을 클릭했을 때 이동하는 state
+'''
+
+def make_state_id(folder, names):
+    # 같은 템플릿 파일 이름을 가진 다른 폴더가 하나의 state 로 합쳐지지 않도록 폴더 포함
+    folder = os.path.normpath(folder).replace('\\', '/')
+    return folder + "#" + "|".join(sorted(set(names)))
+
+class UINavigationGraph():
+
+    __slot__ = ['path','states','edges','folders','lock']
+
+    def __init__(self, path="screen/ui_graph.json"):
+        self.path = path
+        self.states = {}    # state_id -> { 'folder', 'items' }
+        self.edges = {}     # state_id -> { template name -> { 'type', 'coord', 'to' } }
+        self.folders = {}   # folder -> state_id
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        self.states = data.get('states', {})
+        self.edges = data.get('edges', {})
+        self.folders = {state['folder']: sid for sid, state in self.states.items()}
+
+    def save(self):
+        with self.lock:
+            data = {'states': self.states, 'edges': self.edges}
+            with open(self.path, 'w', encoding='utf-8') as json_file:
+                json.dump(data, json_file, ensure_ascii=False, indent=4)
+
+    def add_state(self, folder, items):
+        # items : [[ItemType, [name, coord]], ...]
+        sid = make_state_id(folder, [dinfo[0] for _, dinfo in items])
+        with self.lock:
+            self.states[sid] = {
+                'folder': folder,
+                'items': [[ptype.name, dinfo] for ptype, dinfo in items],
+            }
+            self.folders[folder] = sid
+            self.edges.setdefault(sid, {})
+        return sid
+
+    def add_edge(self, src, name, ptype, coord, dst):
+        # 클릭 후 화면을 알 수 없거나 ( 매칭 실패 ) 같은 화면이면 edge 로 기록하지 않음
+        if src is None or dst is None or src == dst:
+            return
+        with self.lock:
+            self.edges.setdefault(src, {})[name] = {'type': ptype.name, 'coord': coord, 'to': dst}
+
+    def state_of_folder(self, folder):
+        return self.folders.get(folder)
+
+    def cached_items(self, folder):
+        # 이미 알고 있는 화면이면 매칭 없이 Item 목록을 재사용
+        sid = self.folders.get(folder)
+        if sid is None:
+            return None
+        return [[ItemType[ptype], dinfo] for ptype, dinfo in self.states[sid]['items']]
+
+    def find_target_state(self, target):
+        # target 은 폴더 이름(ex. select_options) 또는 화면에 존재하는 템플릿 이름
+        for sid, state in self.states.items():
+            if os.path.basename(state['folder']) == target:
+                return sid
+        for sid, state in self.states.items():
+            if any(dinfo[0] == target for _, dinfo in state['items']):
+                return sid
+        return None
+
+    def find_path(self, src, dst):
+        # BFS 로 최소 클릭 경로 탐색, [ (name, edge), ... ] 반환
+        if src == dst:
+            return []
+        visited = {src}
+        queue = deque([(src, [])])
+        while queue:
+            sid, path = queue.popleft()
+            for name, edge in self.edges.get(sid, {}).items():
+                nxt = edge['to']
+                if nxt in visited:
+                    continue
+                if nxt == dst:
+                    return path + [(name, edge)]
+                visited.add(nxt)
+                queue.append((nxt, path + [(name, edge)]))
+        return None
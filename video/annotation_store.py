@@ -0,0 +1,147 @@
+import os
+import json
+
+'''
+ COCO annotation 을 메모리에 누적하는 저장소
+ - id 할당 / 카테고리 조회는 dict 로 O(1)
+ - 프레임마다 JSONL shard 에 한 줄씩 추가 ( 중간에 종료되어도 복구 가능 )
+ - checkpoint_every 개마다 COCO JSON 을 갱신, 종료시 최종 export
+
+ store = AnnotationStore('video/dataset/annotations.json')
+ image_id = store.add_image('video/dataset/images/3f2a9c0d1e7b6a45.jpg', 2560, 1440)
+ store.add_annotation(image_id, 'play', [x0, y0, x1, y1], area)
+ store.close()
+'''
+
+class AnnotationStore():
+
+    __slot__ = ['json_path','shard_path','supercategory','checkpoint_every','data','category_ids','image_ids','next_image_id','next_ann_id','shard','pending']
+
+    def __init__(self, json_path, shard_path=None, supercategory="geometryDash", checkpoint_every=500):
+        self.json_path = json_path
+        self.shard_path = shard_path if shard_path is not None else os.path.splitext(json_path)[0] + ".jsonl"
+        self.supercategory = supercategory
+        self.checkpoint_every = checkpoint_every
+        self.data = {'images': [], 'annotations': [], 'categories': []}
+        self.category_ids = {}  # name -> category id
+        self.image_ids = {}     # file_name -> image id ( 같은 이미지는 한번만 등록 )
+        self.next_image_id = 1
+        self.next_ann_id = 1
+        self.shard = None
+        self.pending = 0
+        self.load()
+
+    def load(self):
+        # 이전 결과가 있으면 이어서 누적 ( COCO JSON 뒤에 shard 에만 남은 기록 복구 )
+        if os.path.exists(self.json_path):
+            with open(self.json_path, 'r', encoding='utf-8') as json_file:
+                self.data = json.load(json_file)
+        known_images = {image['id'] for image in self.data['images']}
+        known_anns = {ann['id'] for ann in self.data['annotations']}
+        known_categories = {category['id'] for category in self.data['categories']}
+        if os.path.exists(self.shard_path):
+            with open(self.shard_path, 'r', encoding='utf-8') as jsonl_file:
+                for line in jsonl_file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    # 한 줄에 image / annotation / category 중 새로 추가된 항목만 기록됨
+                    record = json.loads(line)
+                    category, image, annotation = record.get('category'), record.get('image'), record.get('annotation')
+                    if category is not None and category['id'] not in known_categories:
+                        known_categories.add(category['id'])
+                        self.data['categories'].append(category)
+                    if image is not None and image['id'] not in known_images:
+                        known_images.add(image['id'])
+                        self.data['images'].append(image)
+                    if annotation is not None and annotation['id'] not in known_anns:
+                        known_anns.add(annotation['id'])
+                        self.data['annotations'].append(annotation)
+        self.category_ids = {category['name']: category['id'] for category in self.data['categories']}
+        self.image_ids = {image['file_name']: image['id'] for image in self.data['images']}
+        if self.data['images']:
+            self.next_image_id = max(image['id'] for image in self.data['images']) + 1
+        if self.data['annotations']:
+            self.next_ann_id = max(ann['id'] for ann in self.data['annotations']) + 1
+
+    def category_id(self, name):
+        # 새 카테고리면 등록 후 ( id, 새 카테고리 dict ) 반환
+        if name in self.category_ids:
+            return self.category_ids[name], None
+        category = {'id': len(self.category_ids) + 1, 'name': name, 'supercategory': self.supercategory}
+        self.category_ids[name] = category['id']
+        self.data['categories'].append(category)
+        return category['id'], category
+
+    def write_record(self, record):
+        if self.shard is None:
+            self.shard = open(self.shard_path, 'a', encoding='utf-8', buffering=1)
+        self.shard.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def has_image(self, file_name):
+        return file_name in self.image_ids
+
+    def add_image(self, file_name, width, height):
+        # 이미 등록된 이미지면 기존 id 반환
+        if file_name in self.image_ids:
+            return self.image_ids[file_name]
+        image = {'id': self.next_image_id, 'file_name': file_name, 'width': width, 'height': height}
+        self.next_image_id += 1
+        self.image_ids[file_name] = image['id']
+        self.data['images'].append(image)
+        self.write_record({'image': image})
+        return image['id']
+
+    def add_annotation(self, image_id, name, bbox, area, iscrowd=0):
+        category_id, new_category = self.category_id(name)
+        annotation = {'id': self.next_ann_id, 'image_id': image_id, 'category_id': category_id, 'bbox': bbox, 'area': area, 'iscrowd': iscrowd}
+        self.next_ann_id += 1
+        self.data['annotations'].append(annotation)
+        self.write_record({'annotation': annotation, 'category': new_category})
+
+        self.pending += 1
+        if self.checkpoint_every and self.pending >= self.checkpoint_every:
+            self.checkpoint()
+        return annotation
+
+    def add(self, file_name, width, height, name, bbox, area, iscrowd=0):
+        image_id = self.add_image(file_name, width, height)
+        return self.add_annotation(image_id, name, bbox, area, iscrowd)
+
+    def merge(self, data):
+        # 다른 worker 가 만든 COCO 데이터를 이어붙임 ( image / annotation / category id 재할당 )
+        names = {category['id']: category['name'] for category in data['categories']}
+        image_ids = {}
+        for image in sorted(data['images'], key=lambda image: image['id']):
+            # 다른 구간에서 이미 등록된 같은 이미지( 같은 content hash )는 건너뜀
+            if self.has_image(image['file_name']):
+                continue
+            image_ids[image['id']] = self.add_image(image['file_name'], image['width'], image['height'])
+        for ann in sorted(data['annotations'], key=lambda ann: ann['id']):
+            if ann['image_id'] not in image_ids:
+                continue
+            self.add_annotation(image_ids[ann['image_id']], names[ann['category_id']], ann['bbox'], ann['area'], ann.get('iscrowd', 0))
+        return len(image_ids)
+
+    def checkpoint(self):
+        # 중간 저장은 indent 없이 빠르게
+        self.export(indent=None)
+        self.pending = 0
+
+    def export(self, path=None, indent=4):
+        path = path if path is not None else self.json_path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as json_file:
+            json.dump(self.data, json_file, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
+        return path
+
+    def close(self):
+        self.export()
+        if self.shard is not None:
+            self.shard.close()
+            self.shard = None
+        # 최종 COCO JSON 에 모두 반영되었으므로 shard 정리
+        if os.path.exists(self.shard_path):
+            os.remove(self.shard_path)
+        print(f"Annotations : {len(self.data['images'])} images, {len(self.data['categories'])} categories -> {self.json_path}")
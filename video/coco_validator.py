@@ -0,0 +1,278 @@
+import os, sys, json, time
+import argparse
+from array import array
+from collections import Counter, defaultdict
+
+import numpy as np
+
+'''
+ COCO annotation 파일 검증 / 통계 도구
+ - 파일 전체를 json.load 하지 않고 images / annotations 배열을 원소 단위로 읽음 ( 수 GB 파일 대응 )
+ - 이미지 파일은 열지 않음 ( --check-files 사용시 존재 여부만 확인 )
+
+ python video/coco_validator.py video/dataset/annotations.json --bbox-format xyxy
+'''
+
+def iter_coco_items(path, chunk_size=1 << 20):
+    # 최상위 객체의 ( key, value ) 를 순서대로 반환, 배열 값은 ( key, 원소 ) 로 하나씩 반환
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as json_file:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = json_file.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip(chars=" \t\r\n"):
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return
+
+        def peek():
+            skip()
+            return buf[pos] if pos < len(buf) else ""
+
+        def decode():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # 숫자처럼 chunk 경계에서 잘린 값일 수 있으므로 뒤에 문자가 있을 때만 확정
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                if not fill():
+                    value, pos = decoder.raw_decode(buf, pos)
+                    return value
+
+        def expect(char):
+            nonlocal pos
+            if peek() != char:
+                raise ValueError(f"'{char}' expected at offset {pos} of current chunk")
+            pos += 1
+
+        expect('{')
+        while True:
+            skip(" \t\r\n,")
+            if peek() == '}':
+                return
+            key = decode()
+            expect(':')
+            if peek() != '[':
+                yield key, decode()
+                continue
+            pos += 1
+            while True:
+                skip(" \t\r\n,")
+                if peek() == ']':
+                    pos += 1
+                    break
+                yield key, decode()
+
+def to_xywh(bbox, bbox_format):
+    if bbox_format == "xyxy":
+        return bbox[0], bbox[1], bbox[2] - bbox[0], bbox[3] - bbox[1]
+    return bbox[0], bbox[1], bbox[2], bbox[3]
+
+class COCOValidator():
+
+    __slot__ = ['bbox_format','check_files','root','image_ids','file_names','image_sizes','categories','ann_ids',
+                'ann_per_image','class_counts','image_digests','box_hashes','pending','widths','heights','errors','warnings','counts','examples']
+
+    def __init__(self, bbox_format="xyxy", check_files=False, root=""):
+        # make_argments 는 bbox 를 [x0, y0, x1, y1] 로 기록 ( detr_train 과 동일 ), 표준 COCO 는 xywh
+        self.bbox_format = bbox_format
+        self.check_files = check_files
+        self.root = root
+        self.image_ids = set()
+        self.file_names = {}            # file_name -> image id
+        self.image_sizes = {}           # image id -> (width, height)
+        self.categories = {}            # category id -> name
+        self.ann_ids = set()
+        self.ann_per_image = Counter()
+        self.class_counts = Counter()   # category id -> count
+        # 박스 목록은 보관하지 않음 ( 파일 크기에 비례해 메모리가 늘어나지 않도록 )
+        self.image_digests = defaultdict(int)   # image id -> 박스 hash 합 ( 순서와 무관, 같은 annotation 구성의 이미지 검사 )
+        self.box_hashes = array('Q')            # ( image, category, bbox ) hash, 박스당 8 byte ( 이미지 안의 중복 박스 검사 )
+        self.pending = []                       # image 보다 먼저 나온 annotation 의 ( image id, bbox ), 범위 검사용
+        self.widths = array('f')
+        self.heights = array('f')
+        self.errors = Counter()
+        self.warnings = Counter()
+        self.counts = Counter()
+        self.examples = defaultdict(list)
+
+    def error(self, kind, detail, level="errors"):
+        getattr(self, level)[kind] += 1
+        if len(self.examples[kind]) < 5:
+            self.examples[kind].append(detail)
+
+    def add_image(self, image):
+        self.counts['images'] += 1
+        image_id = image.get('id')
+        if image_id in self.image_ids:
+            self.error('duplicate image id', image_id)
+        self.image_ids.add(image_id)
+        file_name = image.get('file_name')
+        if file_name in self.file_names:
+            self.error('duplicate image file', file_name)
+        else:
+            self.file_names[file_name] = image_id
+        width, height = image.get('width'), image.get('height')
+        if not width or not height:
+            self.error('missing image size', image_id)
+        self.image_sizes[image_id] = (width or 0, height or 0)
+        if self.check_files and not os.path.exists(os.path.join(self.root, file_name or "")):
+            self.error('missing image file', file_name)
+
+    def add_category(self, category):
+        self.counts['categories'] += 1
+        if category.get('id') in self.categories:
+            self.error('duplicate category id', category.get('id'))
+        self.categories[category.get('id')] = category.get('name')
+
+    def add_annotation(self, ann):
+        self.counts['annotations'] += 1
+        ann_id = ann.get('id')
+        if ann_id in self.ann_ids:
+            self.error('duplicate annotation id', ann_id)
+        self.ann_ids.add(ann_id)
+        image_id = ann.get('image_id')
+        self.ann_per_image[image_id] += 1
+        self.class_counts[ann.get('category_id')] += 1
+
+        bbox = ann.get('bbox')
+        if not isinstance(bbox, (list, tuple)) or len(bbox) != 4 or not all(isinstance(v, (int, float)) for v in bbox):
+            self.error('invalid bbox', (ann_id, bbox))
+            return
+        x, y, w, h = to_xywh(bbox, self.bbox_format)
+        if w <= 0 or h <= 0:
+            self.error('non-positive bbox size', (ann_id, bbox))
+            return
+        self.widths.append(w)
+        self.heights.append(h)
+        box_hash = hash((ann.get('category_id'), tuple(round(v) for v in bbox))) & 0xFFFFFFFFFFFFFFFF
+        self.image_digests[image_id] = (self.image_digests[image_id] + box_hash) & 0xFFFFFFFFFFFFFFFF
+        self.box_hashes.append(hash((image_id, box_hash)) & 0xFFFFFFFFFFFFFFFF)
+        if image_id in self.image_sizes:
+            self.check_bounds(image_id, bbox)
+        else:
+            self.pending.append((image_id, bbox))
+        if ann.get('area') is not None and abs(ann['area'] - w * h) > 0.01 * w * h + 1:
+            self.error('area mismatch', (ann_id, ann['area'], w * h), "warnings")
+
+    def check_bounds(self, image_id, bbox):
+        w, h = self.image_sizes.get(image_id, (0, 0))
+        x, y, bw, bh = to_xywh(bbox, self.bbox_format)
+        if w and h and (x < 0 or y < 0 or x + bw > w + 1 or y + bh > h + 1):
+            self.error('bbox outside image', (image_id, bbox), "warnings")
+
+    def finish(self):
+        # 순서와 무관한 참조 검사 ( annotations 가 images 보다 먼저 나올 수 있음 )
+        for image_id in self.ann_per_image:
+            if image_id not in self.image_ids:
+                self.error('annotation for unknown image', image_id)
+        for category_id in self.class_counts:
+            if category_id not in self.categories:
+                self.error('unknown category id', category_id)
+        empty = len(self.image_ids) - len(self.image_ids & set(self.ann_per_image))
+        if empty > 0:
+            self.warnings['images without annotations'] += empty
+
+        for image_id, bbox in self.pending:
+            self.check_bounds(image_id, bbox)
+        self.pending = []
+
+        if len(self.box_hashes) > 0:
+            hashes = np.frombuffer(self.box_hashes, dtype=np.uint64)
+            duplicated = len(hashes) - len(np.unique(hashes))
+            if duplicated > 0:
+                self.warnings['duplicated box in image'] += duplicated
+        # 같은 카테고리 / 같은 박스 구성의 이미지는 거의 같은 프레임일 가능성이 높음
+        image_groups = Counter((self.ann_per_image[image_id], digest) for image_id, digest in self.image_digests.items())
+        self.warnings['images sharing identical annotations'] += sum(count - 1 for count in image_groups.values() if count > 1)
+
+    def scan(self, path):
+        start = time.perf_counter()
+        handlers = {'images': self.add_image, 'annotations': self.add_annotation, 'categories': self.add_category}
+        for key, item in iter_coco_items(path):
+            handler = handlers.get(key)
+            if handler is not None and isinstance(item, dict):
+                handler(item)
+        self.finish()
+        self.counts['scan_ms'] = int((time.perf_counter() - start) * 1000)
+        return self.summary()
+
+    def summary(self):
+        widths = np.frombuffer(self.widths, dtype=np.float32) if len(self.widths) else np.zeros(0, dtype=np.float32)
+        heights = np.frombuffer(self.heights, dtype=np.float32) if len(self.heights) else np.zeros(0, dtype=np.float32)
+        percentiles = [0, 5, 50, 95, 100]
+        box_stats = {}
+        if len(widths) > 0:
+            areas = widths * heights
+            box_stats = {
+                'width': dict(zip(map(str, percentiles), np.percentile(widths, percentiles).round(1).tolist())),
+                'height': dict(zip(map(str, percentiles), np.percentile(heights, percentiles).round(1).tolist())),
+                # COCO 기준 small(<32^2) / medium / large(>96^2)
+                'size': {'small': int(np.sum(areas < 32 ** 2)), 'medium': int(np.sum((areas >= 32 ** 2) & (areas < 96 ** 2))), 'large': int(np.sum(areas >= 96 ** 2))},
+            }
+        per_image = list(self.ann_per_image.values())
+        return {
+            'counts': dict(self.counts),
+            'classes': {str(self.categories.get(cid, cid)): count for cid, count in self.class_counts.most_common()},
+            'boxes': box_stats,
+            'annotations_per_image': {'max': max(per_image) if per_image else 0, 'mean': round(sum(per_image) / len(per_image), 2) if per_image else 0},
+            'errors': dict(self.errors),
+            'warnings': dict(self.warnings),
+            'examples': {kind: [str(example) for example in examples] for kind, examples in self.examples.items()},
+        }
+
+def print_summary(summary):
+    counts = summary['counts']
+    print(f"images {counts.get('images', 0)}, annotations {counts.get('annotations', 0)}, categories {counts.get('categories', 0)} ({counts.get('scan_ms', 0)} ms)")
+    print("classes :")
+    for name, count in summary['classes'].items():
+        print(f"  {name:<20} {count}")
+    if summary['boxes']:
+        print(f"box width  (p0/p5/p50/p95/p100) : {list(summary['boxes']['width'].values())}")
+        print(f"box height (p0/p5/p50/p95/p100) : {list(summary['boxes']['height'].values())}")
+        print(f"box size : {summary['boxes']['size']}")
+    print(f"annotations per image : {summary['annotations_per_image']}")
+    for level in ['errors', 'warnings']:
+        for kind, count in summary[level].items():
+            if count > 0:
+                print(f"[{level[:-1]}] {kind} : {count} {summary['examples'].get(kind, [])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="COCO annotation 검증 / 통계")
+    parser.add_argument('annotation', nargs='?', default="video/dataset/annotations.json", help="COCO JSON 파일")
+    parser.add_argument('--bbox-format', choices=['xyxy', 'xywh'], default='xyxy', help="bbox 형식 ( make_argments: xyxy, 표준 COCO: xywh )")
+    parser.add_argument('--check-files', action='store_true', help="이미지 파일 존재 여부 확인 ( 이미지는 열지 않음 )")
+    parser.add_argument('--root', default="", help="이미지 file_name 기준 폴더")
+    parser.add_argument('--json', default=None, help="요약 결과를 JSON 으로 저장")
+    args = parser.parse_args(argv)
+
+    validator = COCOValidator(args.bbox_format, args.check_files, args.root)
+    summary = validator.scan(args.annotation)
+    print_summary(summary)
+    if args.json is not None:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(summary, json_file, ensure_ascii=False, indent=4)
+    return 1 if sum(summary['errors'].values()) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,8 @@ from PIL import Image
 import json
 import re
 
+from image_cache import ImageCache
+
 def sort_files_by_number(file_list):
     def extract_number(file_name):
         match = re.search(r'(\d+)', file_name)
@@ -63,7 +65,7 @@ def denormalize(tensor,mean,std):
 
 # 1. 데이터셋 로드
 class CocoDetectionDataset(Dataset):
-    def __init__(self, root, annotation, transforms=None):
+    def __init__(self, root, annotation, transforms=None, cache=None):
         """
         COCO 데이터셋을 PyTorch Dataset으로 변환.
 
@@ -71,11 +73,13 @@ class CocoDetectionDataset(Dataset):
             root (str): 이미지 파일들이 저장된 경로.
             annotation (str): COCO 포맷의 annotation 파일 경로.
             transforms (callable, optional): 이미지를 전처리하기 위한 transform 함수.
+            cache (ImageCache, optional): 미리 디코딩된 이미지 캐시. 있으면 JPEG 를 다시 디코딩하지 않음.
         """
         self.root = root
         self.coco = COCO(annotation)
         self.ids = list(self.coco.imgs.keys())
         self.transforms = transforms
+        self.cache = cache
 
     def __getitem__(self, index):
         # 이미지 ID 가져오기
@@ -84,7 +88,13 @@ class CocoDetectionDataset(Dataset):
         # 이미지 경로 및 읽기
         img_info = self.coco.loadImgs(img_id)[0]
         img_path = os.path.join(self.root, img_info['file_name'])
-        image = Image.open(img_path).convert('RGB')
+        # 캐시가 있으면 memmap view 사용 ( resize 된 이미지이므로 bbox 도 같은 배율로 변환 )
+        scale = 1.0
+        if self.cache is not None and img_info['file_name'] in self.cache:
+            image = self.cache.get(img_info['file_name'])
+            scale = self.cache.scale(img_info['file_name'])
+        else:
+            image = Image.open(img_path).convert('RGB')
 
         # Annotation 가져오기
         ann_ids = self.coco.getAnnIds(imgIds=img_id)
@@ -98,7 +108,7 @@ class CocoDetectionDataset(Dataset):
             boxes.append([x, y, x + w, y + h])  # COCO는 [x, y, width, height] 형식
             labels.append(ann['category_id'])
 
-        boxes = torch.tensor(boxes, dtype=torch.float32)
+        boxes = torch.tensor(boxes, dtype=torch.float32) * scale
         labels = torch.tensor(labels, dtype=torch.int64)
 
         # 타겟 데이터 생성
@@ -117,7 +127,7 @@ class CocoDetectionDataset(Dataset):
     def __len__(self):
         return len(self.ids)
 
-def prepare_dataloader(root, annotation, batch_size=4):
+def prepare_dataloader(root, annotation, batch_size=4, cache_path=None):
     """
     COCO 데이터셋을 로드하고 DataLoader를 준비.
 
@@ -125,12 +135,16 @@ def prepare_dataloader(root, annotation, batch_size=4):
         root (str): COCO 이미지 파일들이 저장된 경로.
         annotation (str): COCO annotation 파일 경로.
         batch_size (int): 배치 크기.
+        cache_path (str, optional): 이미지 캐시 경로. 없으면 매 epoch 마다 JPEG 디코딩.
 
     Returns:
         DataLoader: PyTorch DataLoader 객체.
     """
     transforms = get_transforms()
     dataset = CocoDetectionDataset(root, annotation, transforms)
+    if cache_path is not None:
+        # 첫 실행에서만 디코딩 / resize, 이후 epoch / 실행은 memmap 에서 바로 읽음
+        dataset.cache = ImageCache.open_or_build(root, [image['file_name'] for image in dataset.coco.imgs.values()], cache_path)
     
     dataloader = DataLoader(
         dataset,
@@ -324,7 +338,8 @@ def main():
     # Dataset and Dataloader
 
     # Dataset and Dataloader
-    data_loader = prepare_dataloader(data_dir,annotation_dir)
+    cache_path = "./video/dataset/cache/train"
+    data_loader = prepare_dataloader(data_dir,annotation_dir,cache_path=cache_path)
 
     # Model, optimizer, and scheduler
     # model = get_model(num_classes).to(device)
@@ -17,6 +17,8 @@ from PIL import Image
 import json
 import re
 
+from image_cache import ImageCache
+
 def sort_files_by_number(file_list):
     def extract_number(file_name):
         match = re.search(r'(\d+)', file_name)
@@ -63,7 +65,7 @@ def collate_fn(processor_DETR, batch):
 
 # 1. 데이터셋 로드
 class CustomDataset(Dataset):
-    def __init__(self, root, annotation, transforms=None):
+    def __init__(self, root, annotation, transforms=None, cache=None):
         """
         COCO 데이터셋을 PyTorch Dataset으로 변환.
 
@@ -71,6 +73,7 @@ class CustomDataset(Dataset):
             root (str): 이미지 파일들이 저장된 경로.
             annotation (str): COCO 포맷의 annotation 파일 경로.
             transforms (callable, optional): 이미지를 전처리하기 위한 transform 함수.
+            cache (ImageCache, optional): 미리 디코딩된 이미지 캐시. 있으면 JPEG 를 다시 디코딩하지 않음.
         """
         self.root = root
         # self.annotations = COCO(annotation)
@@ -84,6 +87,7 @@ class CustomDataset(Dataset):
         self.ids = self.annotations['images']
         self.img_info = self.annotations['images']
         self.transforms = transforms
+        self.cache = cache
 
     def __getitem__(self, index):
         # 이미지 ID 가져오기
@@ -94,7 +98,13 @@ class CustomDataset(Dataset):
         # img_info = self.coco.loadImgs(img_id)[0]
         img_info = self.img_info[index]
         img_path = os.path.join(self.root, img_info['file_name'])
-        image = Image.open(img_path).convert('RGB')
+        # 캐시가 있으면 memmap view 사용 ( resize 된 이미지이므로 bbox 도 같은 배율로 변환 )
+        scale = 1.0
+        if self.cache is not None and img_info['file_name'] in self.cache:
+            image = self.cache.get(img_info['file_name'])
+            scale = self.cache.scale(img_info['file_name'])
+        else:
+            image = Image.open(img_path).convert('RGB')
 
         # Annotation 가져오기
         # ann_ids = self.coco.getAnnIds(imgIds=img_id)
@@ -110,7 +120,7 @@ class CustomDataset(Dataset):
             boxes.append(ann['bbox'])
             labels.append(ann['category_id'])
 
-        boxes = torch.tensor(boxes, dtype=torch.float32)
+        boxes = torch.tensor(boxes, dtype=torch.float32) * scale
         labels = torch.tensor(labels, dtype=torch.int64)
 
         # 타겟 데이터 생성
@@ -129,7 +139,7 @@ class CustomDataset(Dataset):
     def __len__(self):
         return len(self.ids)
 
-def prepare_dataloader(root, annotation, batch_size=4):
+def prepare_dataloader(root, annotation, batch_size=4, cache_path=None):
     """
     COCO 데이터셋을 로드하고 DataLoader를 준비.
 
@@ -137,12 +147,16 @@ def prepare_dataloader(root, annotation, batch_size=4):
         root (str): COCO 이미지 파일들이 저장된 경로.
         annotation (str): COCO annotation 파일 경로.
         batch_size (int): 배치 크기.
+        cache_path (str, optional): 이미지 캐시 경로. 없으면 매 epoch 마다 JPEG 디코딩.
 
     Returns:
         DataLoader: PyTorch DataLoader 객체.
     """
     transforms = get_transforms()
     dataset = CustomDataset(root, annotation, transforms)
+    if cache_path is not None:
+        # 첫 실행에서만 디코딩 / resize, 이후 epoch / 실행은 memmap 에서 바로 읽음
+        dataset.cache = ImageCache.open_or_build(root, [image['file_name'] for image in dataset.img_info], cache_path)
     
     dataloader = DataLoader(
         dataset,
@@ -276,7 +290,8 @@ def main():
 
 
     # Dataset and Dataloader
-    data_loader = prepare_dataloader(data_dir,annotation_dir)
+    cache_path = "./video/dataset/cache/train"
+    data_loader = prepare_dataloader(data_dir,annotation_dir,cache_path=cache_path)
 
     # Model, optimizer, and scheduler
     num_classes = 2  # COCO has 80 classes + background
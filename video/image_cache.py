@@ -0,0 +1,138 @@
+import os, json, time
+import concurrent.futures
+
+import cv2
+import numpy as np
+from PIL import Image
+
+'''
+ 학습 이미지를 한번만 디코딩 / resize 해서 memory-mapped uint8 파일로 저장하는 캐시
+ - <cache>.bin : 모든 이미지( RGB, HWC )를 이어붙인 uint8 배열
+ - <cache>.json : file_name 별 ( offset, shape, scale ) 와 원본 파일 ( 크기, 수정시간 )
+ - 원본 헤더만 읽어 배치를 먼저 계산한 뒤, thread pool 에서 디코딩 결과를 memmap 위치에 바로 기록
+ - get() 은 memmap 의 view 를 반환 ( 복사 / JPEG 디코딩 없음 ), DataLoader worker 마다 memmap 을 다시 연다
+
+ cache = ImageCache.open_or_build("./", file_names, "./video/dataset/cache/train", max_size=(1333, 800))
+ image = cache.get(file_name)       # (h, w, 3) RGB uint8
+ boxes = boxes * cache.scale(file_name)
+'''
+
+def fit_size(width, height, max_size):
+    # 비율을 유지하면서 max_size( width, height ) 안에 들어가는 크기 ( 확대하지 않음 )
+    if max_size is None:
+        return width, height, 1.0
+    scale = min(max_size[0] / width, max_size[1] / height, 1.0)
+    return max(int(round(width * scale)), 1), max(int(round(height * scale)), 1), scale
+
+def source_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class ImageCache():
+
+    __slot__ = ['cache_path','max_size','entries','total','array']
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        with open(cache_path + ".json", 'r', encoding='utf-8') as json_file:
+            index = json.load(json_file)
+        self.max_size = index['max_size']
+        self.entries = index['entries']     # file_name -> {offset, shape, scale, source}
+        self.total = index['total']
+        self.array = None
+
+    @staticmethod
+    def build(root, file_names, cache_path, max_size=(1333, 800), workers=None):
+        start = time.perf_counter()
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 1) 헤더만 읽어서 resize 크기 / offset 계산
+        entries = {}
+        offset = 0
+        for file_name in file_names:
+            if file_name in entries:
+                continue
+            path = os.path.join(root, file_name)
+            with Image.open(path) as image:
+                width, height = image.size
+            new_w, new_h, scale = fit_size(width, height, max_size)
+            entries[file_name] = {'offset': offset, 'shape': [new_h, new_w, 3], 'scale': scale, 'source': source_signature(path)}
+            offset += new_h * new_w * 3
+
+        # 2) 디코딩 + resize 결과를 memmap 의 해당 위치에 바로 기록 ( cv2 는 GIL 을 놓으므로 thread 로 병렬 처리 )
+        tmp_path = cache_path + ".bin.tmp"
+        array = np.memmap(tmp_path, dtype=np.uint8, mode='w+', shape=(max(offset, 1),))
+
+        def decode(item):
+            file_name, entry = item
+            h, w, c = entry['shape']
+            view = array[entry['offset']:entry['offset'] + h * w * c].reshape(h, w, c)
+            image = cv2.imread(os.path.join(root, file_name), cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError(f"decode failed : {file_name}")
+            if image.shape[:2] != (h, w):
+                image = cv2.resize(image, (w, h), interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=view)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+            list(pool.map(decode, entries.items()))
+        array.flush()
+        del array
+
+        # 데이터와 index 모두 완성된 뒤에 교체 ( 중간에 종료되어도 깨진 캐시를 열지 않음 )
+        os.replace(tmp_path, cache_path + ".bin")
+        with open(cache_path + ".json.tmp", 'w', encoding='utf-8') as json_file:
+            json.dump({'max_size': list(max_size) if max_size is not None else None, 'total': offset, 'entries': entries}, json_file, ensure_ascii=False)
+        os.replace(cache_path + ".json.tmp", cache_path + ".json")
+        print(f"Image cache : {len(entries)} images ({offset / 1024 / 1024:.1f} MB) built in {time.perf_counter() - start:.1f} s -> {cache_path}.bin")
+        return ImageCache(cache_path)
+
+    @staticmethod
+    def open_or_build(root, file_names, cache_path, max_size=(1333, 800), workers=None):
+        # 이미지 목록 / max_size / 원본 파일이 바뀌지 않았으면 기존 캐시 사용
+        if os.path.exists(cache_path + ".json") and os.path.exists(cache_path + ".bin"):
+            cache = ImageCache(cache_path)
+            if cache.is_valid(root, file_names, max_size):
+                return cache
+        return ImageCache.build(root, file_names, cache_path, max_size, workers)
+
+    def is_valid(self, root, file_names, max_size):
+        if self.max_size != (list(max_size) if max_size is not None else None):
+            return False
+        if set(file_names) != set(self.entries):
+            return False
+        for file_name, entry in self.entries.items():
+            path = os.path.join(root, file_name)
+            if not os.path.exists(path) or source_signature(path) != entry['source']:
+                return False
+        return True
+
+    def __getstate__(self):
+        # DataLoader worker 로 전달할 때 memmap 내용을 복사하지 않도록 경로만 전달
+        state = self.__dict__.copy()
+        state['array'] = None
+        return state
+
+    def open(self):
+        # copy-on-write 로 열어서 torch.from_numpy 에서도 쓰기 가능 ( 실제 파일은 변경되지 않음 )
+        if self.array is None:
+            self.array = np.memmap(self.cache_path + ".bin", dtype=np.uint8, mode='c', shape=(max(self.total, 1),))
+        return self.array
+
+    def __contains__(self, file_name):
+        return file_name in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, file_name):
+        # (h, w, 3) RGB uint8 view
+        entry = self.entries[file_name]
+        h, w, c = entry['shape']
+        return self.open()[entry['offset']:entry['offset'] + h * w * c].reshape(h, w, c)
+
+    def scale(self, file_name):
+        # 원본 좌표 -> 캐시 이미지 좌표 배율 ( bbox 에 곱해서 사용 )
+        return self.entries[file_name]['scale']
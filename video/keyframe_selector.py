@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+'''
+ 연속된 프레임 중 정보가 있는 프레임( keyframe )만 골라내는 selector
+ - 최소 간격( min_stride ) 이내의 프레임은 건너뜀
+ - 직전 keyframe 과 히스토그램 상관도 / 축소 이미지 차이를 비교해 거의 같은 화면은 건너뜀
+ - max_gap 프레임 동안 keyframe 이 없으면 변화가 없어도 한장 선택 ( 데이터 다양성 유지 )
+
+ selector = KeyframeSelector(min_stride=5, max_similarity=0.98)
+ if selector.is_keyframe(frame, frame_idx):
+     ...
+ print(selector.report())
+'''
+
+class KeyframeSelector():
+
+    __slot__ = ['min_stride','max_similarity','max_change','pixel_threshold','max_gap','thumb_size','last_idx','last_hist','last_thumb','seen','kept']
+
+    def __init__(self, min_stride=5, max_similarity=0.98, max_change=0.005, max_gap=120, thumb_size=(64, 36), pixel_threshold=25):
+        self.min_stride = min_stride
+        # 히스토그램 상관도가 max_similarity 이상이고 바뀐 픽셀 비율이 max_change 이하이면 같은 화면
+        # ( 히스토그램은 전체 화면 전환, 픽셀 비율은 버튼 이동 같은 국소 변화 감지 )
+        self.max_similarity = max_similarity
+        self.max_change = max_change
+        self.pixel_threshold = pixel_threshold
+        self.max_gap = max_gap
+        self.thumb_size = thumb_size
+        self.last_idx = None
+        self.last_hist = None
+        self.last_thumb = None
+        self.seen = 0
+        self.kept = 0
+
+    def describe(self, frame):
+        # 비교는 축소한 gray 이미지로만 수행
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        hist = cv2.calcHist([thumb], [0], None, [32], [0, 256])
+        cv2.normalize(hist, hist)
+        return thumb, hist
+
+    def similarity(self, thumb, hist):
+        # ( 히스토그램 상관도, 바뀐 픽셀 비율 )
+        correl = cv2.compareHist(self.last_hist, hist, cv2.HISTCMP_CORREL)
+        changed = np.count_nonzero(cv2.absdiff(self.last_thumb, thumb) > self.pixel_threshold) / thumb.size
+        return correl, changed
+
+    def is_keyframe(self, frame, frame_idx):
+        self.seen += 1
+        if self.last_idx is not None and frame_idx - self.last_idx < self.min_stride:
+            return False
+
+        thumb, hist = self.describe(frame)
+        if self.last_idx is not None:
+            gap = frame_idx - self.last_idx
+            correl, changed = self.similarity(thumb, hist)
+            if correl >= self.max_similarity and changed <= self.max_change and (self.max_gap is None or gap < self.max_gap):
+                return False
+
+        self.last_idx = frame_idx
+        self.last_hist = hist
+        self.last_thumb = thumb
+        self.kept += 1
+        return True
+
+    def reduction(self):
+        return 1.0 - self.kept / self.seen if self.seen > 0 else 0.0
+
+    def report(self):
+        return f"Keyframes : {self.kept}/{self.seen} frames kept ({self.reduction() * 100:.1f}% skipped)"
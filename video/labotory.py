@@ -1,13 +1,26 @@
-import cv2,os
+import cv2,os,sys
 import glob
 
 import json
 
 import asyncio
 import concurrent.futures
+import argparse
+import time
+import hashlib
 
 # from process_handler import WindowProcessHandler
+# video 스크립트는 video/ 가 sys.path[0] 이므로 저장소 루트를 추가해서 utils 패키지 공유
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
 from template_matcher import TemplateMatcher
+from utils.image_writer import AsyncImageWriter
+from annotation_store import AnnotationStore
+from template_bank import TemplateBank
+from keyframe_selector import KeyframeSelector
+from template_augmenter import TemplateAugmenter
 
 
 import cv2
@@ -117,28 +130,65 @@ def rotate_image(image, angle):
 
 g_supercategory = f"geometryDash"
 
-# 결과 저장 디렉토리 생성
+# 결과 저장 디렉토리
 output_dir = f'video/dataset/images'
-os.makedirs(output_dir, exist_ok=True)
-    
-# Delete the JSON file if it already exists
 tmp_file = f'../annotations.json'
 json_file_path = os.path.join(output_dir, tmp_file)
-if os.path.exists(json_file_path):
-    os.remove(json_file_path)
+shard_file_path = os.path.splitext(json_file_path)[0] + ".jsonl"
+crop_dir = f'video/dataset/crops'
+
+# 실행시 init_pipeline 에서 생성 ( batch 모드에서는 worker 프로세스마다 생성 )
+image_writer = None
+annotation_store = None
+template_bank = None
+template_augmenter = None
+# True 이면 전체 화면 재검색 대신 직전 위치 주변만 추적 ( TemplateMatcher.experience_video(track=True) )
+use_tracker = False
+# True 이면 검출 영역 crop 도 저장
+save_crops = False
+# True 이면 writer 큐가 가득 찼을 때 프레임을 버리지 않고 대기 ( headless / batch, 화면 출력 지연이 없을 때 )
+block_writes = False
+
+def make_template_loader(augment_options=None):
+    # augment_options ( {'angles': [...], 'scales': [...]} ) 가 있으면 회전 / 크기 변형을 메모리에서 생성해 함께 매칭
+    global template_augmenter
+    if augment_options is None:
+        return make_template
+    template_augmenter = TemplateAugmenter(**augment_options)
+    return lambda folder: template_augmenter.augment_templates(make_template(folder))
+
+def init_pipeline(json_path, shard_path, template_folder, watch=True, track=False, crops=False, augment_options=None, block=False):
+    global image_writer, annotation_store, template_bank, use_tracker, save_crops, block_writes
+    use_tracker = track
+    save_crops = crops
+    block_writes = block
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Delete the JSON file if it already exists
+    for path in [json_path, shard_path]:
+        if os.path.exists(path):
+            os.remove(path)
+    
+    # 프레임 저장은 백그라운드에서 ( sample_every 프레임마다 저장, 디스크 사용량 제한 )
+    image_writer = AsyncImageWriter(max_queue=256, jpeg_quality=95, sample_every=1, disk_budget_mb=20 * 1024)
+    annotation_store = AnnotationStore(json_path, shard_path, supercategory=g_supercategory)
+    # 템플릿은 실행시 한번만 로드, 폴더가 바뀌면 다시 로드
+    template_bank = TemplateBank(template_folder, loader=make_template_loader(augment_options), watch=watch)
+
+def close_pipeline():
+    for name, tracker in labotory.trackers.items():
+        print(f"{os.path.basename(name)} {tracker.report()}")
+    if template_augmenter is not None:
+        print(template_augmenter.report())
+    image_writer.close()
+    print(image_writer.report())
+    annotation_store.close()
 
 def argments_rotate(folder):
+    # 회전 변형은 파일로 저장하지 않고 메모리에서 생성 ( [{name_angle_scale: BGRA image}, ...] )
     is_rotate = True
     templates = make_template(folder,is_rotate)
-    for template in templates:
-        for k,v in template.items():
-            name = k.split('\\')[-1]
-            name = name.split('_')[0]
-            for angle in range(0, 360, 45):
-                rotated_image = rotate_image(v, angle)
-                result_filename = f'{name}_{angle}.png'
-                result_path = os.path.join(output_dir, result_filename)
-                cv2.imwrite(result_path, rotated_image)
+    return TemplateAugmenter(angles=range(0, 360, 45), alpha=True).augment_templates(templates)
             
 def make_images(id,file_name,width,height):
     result = {}
@@ -202,7 +252,9 @@ def make_datasets(match_info,frame, frame_cnt):
             # resized_image = resize_image(values[0], scale)
             result_filename = f'{k}_{frame_cnt}.jpg'
             path = os.path.join(output_dir, result_filename)
-            cv2.imwrite(path, frame)
+            # 저장되지 않은 프레임( 샘플링 / 큐 초과 / 용량 초과 )은 annotation 에서도 제외
+            if not image_writer.write(path, frame, copy=False):
+                continue
 
             h,w,_ = frame.shape
             
@@ -227,88 +279,49 @@ def make_datasets(match_info,frame, frame_cnt):
         
     return datasets, frame_cnt
 
-def make_argments(match_info,frame, frame_cnt):
-    annotations = {}
+def frame_digest(frame):
+    # 프레임 내용 hash ( 같은 프레임은 같은 파일 이름 )
+    return hashlib.blake2b(frame.tobytes(), digest_size=8).hexdigest()
 
-    img_id = 1
-    ann_id = 1
-    category_id = 0
+def save_crop(frame, name, bbox, digest, ann_id):
+    # 검출 영역만 잘라서 카테고리별 폴더에 저장 ( --crops )
+    h,w = frame.shape[:2]
+    x0, y0 = max(int(bbox[0]), 0), max(int(bbox[1]), 0)
+    x1, y1 = min(int(bbox[2]), w), min(int(bbox[3]), h)
+    if x1 <= x0 or y1 <= y0:
+        return
+    image_writer.write(os.path.join(crop_dir, name, f'{digest}_{ann_id}.jpg'), frame[y0:y1, x0:x1], copy=True, block=block_writes)
+
+def make_argments(match_info,frame, frame_cnt):
+    # annotation 은 메모리에 누적하고 JSONL shard 에 한 줄씩 추가 ( 프레임마다 JSON 전체를 다시 쓰지 않음 )
+    # 프레임은 한번만 저장하고 ( content hash 파일 이름 ) 검출된 모든 객체를 같은 image 에 연결
+    if len(match_info) < 1:
+        return annotation_store.data, frame_cnt
     
-    # infos = [ k+v for k,v in info.items() for info in match_info]    
+    h,w,_ = frame.shape
+    digest = frame_digest(frame)
+    path = os.path.join(output_dir, f'{digest}.jpg')
+    if annotation_store.has_image(path):
+        # 이미 저장된 같은 프레임 ( 정지 화면 등 )
+        match_info.clear()
+        return annotation_store.data, frame_cnt
+    # 저장되지 않은 프레임( 샘플링 / 큐 초과 / 용량 초과 )은 annotation 에서도 제외
+    if not image_writer.write(path, frame, copy=False, block=block_writes):
+        match_info.clear()
+        return annotation_store.data, frame_cnt
     
-    # Load existing results if the file exists
-    if os.path.exists(json_file_path):
-        with open(json_file_path, 'r', encoding='utf-8') as json_file:
-            annotations = json.load(json_file)
-        # category_id = int(annotations['categories']['id'])
-        if len(annotations['categories']) > 0:
-
-            
-            category_id = int(annotations['categories'][-1]['id'])
-            ann_id = int(annotations['annotations'][-1]['id'])
-            img_id = int(annotations['images'][-1]['id'])
-            name = annotations['categories'][-1]['name']
-            if name not in categories_name:
-                categories_name.append(name)
-    else:
-        annotations['images'] = []
-        annotations['annotations'] = []
-        annotations['categories'] = []
-
-    # print(f"{len(match_info)}")
+    image_id = annotation_store.add_image(path, w, h)
     while len(match_info) > 0:
         infos = match_info.pop(0)    
         for k,v in infos.items():
             # cv2.rectangle(frame, v[-1][:2], v[-1][2:], (0, 0, 255), 4)
             # cv2.putText(frame, f'{k}', (v[-1][0], v[-1][1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 2)
-            # resized_image = resize_image(values[0], scale)
-            result_filename = f'{k}_{frame_cnt}.jpg'
-            path = os.path.join(output_dir, result_filename)
-            cv2.imwrite(path, frame)
-
-            h,w,_ = frame.shape
-            
-            # w,h = v[-1]
-            # area = w*h
             area = (v[-2][3] - v[-2][1]) * (v[-2][2] - v[-2][0])
-            iscrowd = 0
-            name = k
-            supercategory = g_supercategory
-
-            if len(annotations['images']):
-                img_id = int(annotations['images'][-1]['id'])+1
-            if len(annotations['annotations']):
-                ann_id = int(annotations['annotations'][-1]['id'])+1
-
-            # 이미 존재하는 카테고리 이름을 집합으로 추출
-            if name not in categories_name:
-                if len(categories_name) > 0:
-                    category_id = len(categories_name) + 1
-                else:
-                    category_id = 1
-
-                categories_name.append(name)
-                categories_data = make_categories(category_id, name, supercategory)
-                annotations['categories'].append(categories_data)
-            else:
-                category_id = categories_name.index(name)+1
-
-            images_data = make_images(img_id,path,w,h)            
-            annotation_data = make_annotations(ann_id,img_id,category_id,v[-2],area,iscrowd)
-
-            annotations['images'].append(images_data)
-            annotations['annotations'].append(annotation_data)
-
-            # annotations.append({
-            #     'boxs': v[-2],
-            #     'labels': k,
-            #     'coord': v[-3]
-            # })
-    
-    with open(json_file_path, 'w', encoding='utf-8') as json_file:
-        json.dump(annotations, json_file, ensure_ascii=False, indent=4)
+            annotation = annotation_store.add_annotation(image_id, k, v[-2], area)
+            if save_crops:
+                save_crop(frame, k, v[-2], digest, annotation['id'])
         
-    return annotations, frame_cnt
+    return annotation_store.data, frame_cnt
 
 labotory = TemplateMatcher(template=None,scale_range=(0.5,1.0,0.1))
 
@@ -316,9 +329,9 @@ labotory = TemplateMatcher(template=None,scale_range=(0.5,1.0,0.1))
 desired_fps = 60
 frame_time = 1 / desired_fps
 
-def process_frame(frame,templates):
-    # 프레임을 그레이스케일로 변환
-    return labotory.experience_video(frame,templates)
+def process_frame(frame,template_ids):
+    # 템플릿 배열은 bank 에서 조회 ( 프레임마다 다시 읽지 않음 )
+    return labotory.experience_video(frame,template_bank.get_many(template_ids),track=use_tracker)
 
 def process_match(matches):
     return get_match_info(matches)
@@ -327,25 +340,83 @@ def process_arg(matches_info,frame,frame_cnt):
     return make_argments(matches_info,frame,frame_cnt)
     # return make_datasets(matches_info,frame,frame_cnt)
 
-# 비디오 파일 경로
-video_path = 'video/train_video.mp4'
-# video_path = 'video/test_cat.mp4'
-        
-# 비디오 캡처 객체 생성
-cap = cv2.VideoCapture(video_path)
-
-if not cap.isOpened():
-    print("Error: Could not open video.")
-    exit()
+def make_selector(keyframe_options):
+    # None 이면 모든 프레임 처리
+    return KeyframeSelector(**keyframe_options) if keyframe_options is not None else None
+
+def process_chunk(video_path, start, end, template_folder, part_path, keyframe_options=None, track=False, crops=False, augment_options=None):
+    # batch 모드 worker : [start, end) 프레임 구간을 디코딩 + 매칭, 구간별 annotation 파일 생성
+    init_pipeline(part_path, os.path.splitext(part_path)[0] + ".jsonl", template_folder, watch=False, track=track, crops=crops, augment_options=augment_options, block=True)
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    template_ids = template_bank.ids()
+    selector = make_selector(keyframe_options)
+    
+    frame_cnt = start
+    kept = 0
+    while frame_cnt < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        # 직전 keyframe 과 거의 같은 프레임은 매칭 / 저장하지 않음
+        if selector is not None and not selector.is_keyframe(frame, frame_cnt):
+            frame_cnt += 1
+            continue
+        kept += 1
+        matches = process_frame(frame, template_ids)
+        matches_info = process_match(matches)
+        # 파일 이름에 전체 영상 기준 프레임 번호 사용 ( worker 간 충돌 없음 )
+        process_arg(matches_info, frame, frame_cnt)
+        frame_cnt += 1
+    cap.release()
+    close_pipeline()
+    return part_path, frame_cnt - start, kept
+
+def run_batch(video_path, template_folder, workers=4, chunks=None, keyframe_options=None, track=False, crops=False, augment_options=None):
+    # 영상을 프레임 구간으로 나눠 프로세스별로 처리한 뒤 annotation 병합
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print("Error: Could not open video.")
+        return None
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    
+    chunks = chunks if chunks is not None else workers
+    bounds = [total * i // chunks for i in range(chunks + 1)]
+    part_paths = [os.path.splitext(json_file_path)[0] + f"_part{i}.json" for i in range(chunks)]
+    
+    start_time = time.perf_counter()
+    frames = 0
+    kept = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_chunk, video_path, bounds[i], bounds[i+1], template_folder, part_paths[i], keyframe_options, track, crops, augment_options) for i in range(chunks)]
+        results = [future.result() for future in futures]
+    
+    # 구간 순서대로 병합해서 image / annotation id 를 연속으로 재할당
+    for path in [json_file_path, shard_file_path]:
+        if os.path.exists(path):
+            os.remove(path)
+    store = AnnotationStore(json_file_path, shard_file_path, supercategory=g_supercategory, checkpoint_every=0)
+    for part_path, count, kept_count in results:
+        frames += count
+        kept += kept_count
+        with open(part_path, 'r', encoding='utf-8') as json_file:
+            store.merge(json.load(json_file))
+        os.remove(part_path)
+    store.close()
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"{frames} frames / {chunks} chunks / {workers} workers : {elapsed:.1f} s ({frames / max(elapsed, 1e-6):.1f} fps)")
+    print(f"Keyframes : {kept}/{frames} frames kept ({(1 - kept / max(frames, 1)) * 100:.1f}% skipped)")
+    return store.data
 
-#templates = make_template(f"video/capture")
-template_folder = f"video/capture/arg"
-async def capture_frames():
+async def capture_frames(cap, headless=False, keyframe_options=None):
     frame_cnt = 0    
+    selector = make_selector(keyframe_options)
     paused = False
     loop = asyncio.get_event_loop()
-    # rotate 추가
-    # argments_rotate(template_folder) 
+    # rotate 추가 ( --augment 사용시 TemplateBank 에서 메모리로 생성 )
+    start_time = time.perf_counter()
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
         while True:
@@ -354,13 +425,19 @@ async def capture_frames():
                 if not ret:
                     print("End of video.")
                     break
-            templates = make_template(template_folder)
-            matches = await loop.run_in_executor(pool, process_frame, frame,templates)
-            matches_info = await loop.run_in_executor(pool, process_match, matches)
-            results, _ = await loop.run_in_executor(pool, process_arg, matches_info,frame,frame_cnt)
-                
-            cv2.imshow('Processed Frame', frame)
+            # 직전 keyframe 과 거의 같은 프레임은 매칭 / 저장하지 않음
+            if selector is None or selector.is_keyframe(frame, frame_cnt):
+                template_ids = template_bank.ids()
+                matches = await loop.run_in_executor(pool, process_frame, frame,template_ids)
+                matches_info = await loop.run_in_executor(pool, process_match, matches)
+                results, _ = await loop.run_in_executor(pool, process_arg, matches_info,frame,frame_cnt)
             frame_cnt += 1
+            
+            # headless 모드는 화면 출력 / FPS 대기 없이 처리
+            if headless:
+                continue
+            
+            cv2.imshow('Processed Frame', frame)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
             elif cv2.waitKey(1) & 0xFF == ord('p'):
@@ -368,17 +445,58 @@ async def capture_frames():
             
             await asyncio.sleep(frame_time)
         # frame_queue.put((None, None))
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"{frame_cnt} frames : {elapsed:.1f} s ({frame_cnt / max(elapsed, 1e-6):.1f} fps)")
+    if selector is not None:
+        print(selector.report())
 
         
-async def main():
-    # capture_task = asyncio.create_task(capture_frames())
-    # display_task = asyncio.create_task(display_frames())
-    # await asyncio.gather(capture_task, display_task)
+async def main(video_path, template_folder, headless=False, keyframe_options=None, track=False, crops=False, augment_options=None):
+    # 비디오 캡처 객체 생성
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print("Error: Could not open video.")
+        return
     
-    await capture_frames()
+    init_pipeline(json_file_path, shard_file_path, template_folder, track=track, crops=crops, augment_options=augment_options, block=headless)
+    await capture_frames(cap, headless, keyframe_options)
+    cap.release()
+    close_pipeline()
      # 프레임 캡처와 디스플레이를 비동기로 실행합니다.
     # await asyncio.gather(capture_frames(), display_frames())
     
 
-# 비동기 루프를 실행합니다.
-asyncio.run(main(),debug=True)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="영상에서 GUI 템플릿 매칭으로 COCO 데이터셋 생성")
+    # 비디오 파일 경로
+    parser.add_argument('--video', default='video/train_video.mp4', help="입력 영상 ( ex. video/test_cat.mp4 )")
+    parser.add_argument('--templates', default='video/capture/arg', help="템플릿 폴더")
+    parser.add_argument('--headless', action='store_true', help="imshow / FPS 대기 없이 처리")
+    parser.add_argument('--batch', action='store_true', help="프레임 구간을 나눠 여러 프로세스에서 처리 ( headless )")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help="batch 모드 프로세스 수")
+    parser.add_argument('--chunks', type=int, default=None, help="batch 모드 구간 수 (기본: workers)")
+    parser.add_argument('--all-frames', action='store_true', help="keyframe 선택 없이 모든 프레임 처리")
+    parser.add_argument('--min-stride', type=int, default=5, help="keyframe 최소 프레임 간격")
+    parser.add_argument('--max-similarity', type=float, default=0.98, help="직전 keyframe 과 히스토그램 상관도가 이 값 이상이면 건너뜀")
+    parser.add_argument('--max-gap', type=int, default=120, help="변화가 없어도 이 프레임 수마다 한장 선택")
+    parser.add_argument('--track', action='store_true', help="직전 위치 주변만 검색하는 tracker 사용 ( 추적 실패시 전체 화면 재검색 )")
+    parser.add_argument('--crops', action='store_true', help="검출 영역 crop 을 video/dataset/crops/<카테고리> 에 함께 저장")
+    parser.add_argument('--augment', action='store_true', help="원본 템플릿 폴더( ex. video/capture )에서 회전 / 크기 변형을 메모리로 생성해 매칭")
+    parser.add_argument('--angles', type=int, nargs='+', default=list(range(0, 181, 15)), help="--augment 회전 각도")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0], help="--augment 크기 배율")
+    args = parser.parse_args()
+    
+    augment_options = None
+    if args.augment:
+        augment_options = {'angles': args.angles, 'scales': args.scales}
+    
+    keyframe_options = None
+    if not args.all_frames:
+        keyframe_options = {'min_stride': args.min_stride, 'max_similarity': args.max_similarity, 'max_gap': args.max_gap}
+    
+    if args.batch:
+        run_batch(args.video, args.templates, args.workers, args.chunks, keyframe_options, args.track, args.crops, augment_options)
+    else:
+        # 비동기 루프를 실행합니다.
+        asyncio.run(main(args.video, args.templates, args.headless, keyframe_options, args.track, args.crops, augment_options),debug=True)
@@ -1,8 +1,11 @@
 import cv2
 import json
 import os
+import argparse
 import numpy as np
 
+from template_augmenter import TemplateAugmenter
+
 def rotate_image_with_alpha(image, angle):
     """
     이미지를 회전시키고 배경을 알파 채널로 설정.
@@ -65,45 +68,50 @@ def load_images_from_folder(folder):
             images.append((name,img))
     return images
 
-folder = f"./video/capture"
-load_images = load_images_from_folder(folder)
-
-
-results = []
-
-# 결과 저장 디렉토리 생성
-output_dir = f'./video/capture/arg'
-os.makedirs(output_dir, exist_ok=True)
-
-for name,image in load_images:
-    if image is None:
-        print("Error: Could not load image.")
-        exit()
-    h,w,_ = image.shape
-    name = name.split('_')
-    x = int(name[1])
-    y = int(name[2])
-    coord_x = int((x+w)*0.5)
-    coord_y = int((y+h)*0.5)
-    box  = [y,x,y+h,x+w]
-    name = name[0]
-    # 45도씩 회전 및 크기 조절
-    for angle in range(0, 181, 15):
-        rotated_image = rotate_image_with_alpha(image, angle)
-        for scale in [1.0]:#[0.5, 1.0, 1.5]:
-            resized_image = resize_image(rotated_image, scale)
-            result_filename = f'{name}_{angle}_{scale}.png'
-            result_path = os.path.join(output_dir, result_filename)
-            cv2.imwrite(result_path, resized_image)
-            results.append({
+def preprocess(folder, output_dir, angles=range(0, 181, 15), scales=(1.0,), write_images=False):
+    # 회전 / 크기 변형은 TemplateAugmenter 가 메모리에서 생성 ( labotory --augment / 합성 데이터셋에서 직접 사용 )
+    # write_images=True 일 때만 확인용 PNG 를 저장
+    augmenter = TemplateAugmenter(angles=angles, scales=scales, alpha=True)
+    results = []
+    os.makedirs(output_dir, exist_ok=True)
+
+    for name,image in load_images_from_folder(folder):
+        h,w,_ = image.shape
+        name = name.split('_')
+        x = int(name[1])
+        y = int(name[2])
+        coord_x = int((x+w)*0.5)
+        coord_y = int((y+h)*0.5)
+        box  = [y,x,y+h,x+w]
+        name = name[0]
+        for angle, scale, variant in augmenter.generate(name, image):
+            result = {
                 'name': name,
                 'box': box,
                 'coord': (coord_x,coord_y),
-                'file_path': result_path
-            })
-
-# 결과를 JSON 파일로 저장
-with open(f'{output_dir}/results.json', 'w') as json_file:
-    json.dump(results, json_file, indent=4)
-
-print("Processing complete. Results saved to results.json and output_images directory.")
+                'angle': angle,
+                'scale': scale,
+            }
+            if write_images:
+                result_path = os.path.join(output_dir, f'{name}_{angle}_{scale}.png')
+                cv2.imwrite(result_path, variant)
+                result['file_path'] = result_path
+            results.append(result)
+
+    # 결과를 JSON 파일로 저장
+    with open(f'{output_dir}/results.json', 'w') as json_file:
+        json.dump(results, json_file, indent=4)
+    print(augmenter.report())
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="템플릿 회전 / 크기 변형 정보 생성")
+    parser.add_argument('--folder', default="./video/capture", help="원본 템플릿 폴더 ( name_x_y.png )")
+    parser.add_argument('--output', default="./video/capture/arg", help="results.json 저장 폴더")
+    parser.add_argument('--angles', type=int, nargs='+', default=list(range(0, 181, 15)))
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0])
+    parser.add_argument('--write-images', action='store_true', help="확인용으로 변형 이미지를 PNG 로 저장")
+    args = parser.parse_args()
+
+    preprocess(args.folder, args.output, args.angles, args.scales, args.write_images)
+    print("Processing complete. Results saved to results.json.")
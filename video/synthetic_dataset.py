@@ -0,0 +1,215 @@
+import os, sys, json, time
+import glob
+import argparse
+import concurrent.futures
+
+import cv2
+import numpy as np
+
+# video 스크립트는 video/ 가 sys.path[0] 이므로 저장소 루트를 추가해서 utils 패키지 공유
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from utils.image_writer import AsyncImageWriter
+from annotation_store import AnnotationStore
+from template_augmenter import TemplateAugmenter
+
+'''
+ 영상 매칭 없이 템플릿을 배경 이미지에 합성해서 COCO 데이터셋 생성
+ - 템플릿( video/capture/<name>_x_y.png ) 을 랜덤 위치 / 크기 / 회전으로 배경에 알파 합성
+ - 회전 / 크기 변형은 TemplateAugmenter 캐시 사용 ( scale 은 scale_step 단위로 양자화 )
+ - bbox 는 labotory.make_argments 와 같은 [x0, y0, x1, y1], 알파 영역 기준으로 계산
+ - 이미지 번호별 seed ( seed, index ) 로 생성하므로 worker / 구간 수와 무관하게 같은 결과
+
+ python video/synthetic_dataset.py --count 20000 --workers 8 --backgrounds video/capture/back
+'''
+
+IMAGE_EXTENSIONS = ['*.jpg', '*.jpeg', '*.png', '*.bmp']
+
+output_root = 'video/dataset/synthetic'
+g_supercategory = "geometryDash"
+
+def load_templates(folder):
+    # [(카테고리 이름, BGRA 이미지), ...] ( 파일 이름의 첫 '_' 앞부분이 카테고리 )
+    templates = []
+    for extension in IMAGE_EXTENSIONS:
+        for file in sorted(glob.glob(os.path.join(folder, extension))):
+            image = cv2.imread(file, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                continue
+            name = os.path.basename(file).split('.')[0].split('_')[0]
+            templates.append((name, image))
+    return templates
+
+def load_backgrounds(folder=None, video_path=None, size=(1280, 720), max_count=64):
+    # 배경 폴더 이미지 / 영상에서 고르게 뽑은 프레임을 출력 크기로 미리 resize
+    backgrounds = []
+    if folder is not None:
+        files = []
+        for extension in IMAGE_EXTENSIONS:
+            files.extend(glob.glob(os.path.join(folder, extension)))
+        for file in sorted(files)[:max_count]:
+            image = cv2.imread(file, cv2.IMREAD_COLOR)
+            if image is not None:
+                backgrounds.append(cv2.resize(image, size, interpolation=cv2.INTER_AREA))
+    if video_path is not None:
+        cap = cv2.VideoCapture(video_path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for frame_idx in np.linspace(0, max(total - 1, 0), num=max_count, dtype=np.int64):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_idx))
+            ret, frame = cap.read()
+            if ret:
+                backgrounds.append(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+        cap.release()
+    return backgrounds
+
+def random_backgrounds(seed, size=(1280, 720), count=16):
+    # 배경이 없으면 랜덤 그라데이션 + 노이즈 배경을 worker 시작시 한번만 생성 ( 이미지마다 만들면 합성보다 느림 )
+    rng = np.random.default_rng(seed)
+    w, h = size
+    ramp = np.linspace(0.0, 1.0, w, dtype=np.float32)[None, :, None]
+    backgrounds = []
+    for _ in range(count):
+        start, end = rng.integers(0, 256, size=(2, 3)).astype(np.float32)
+        background = start + (end - start) * ramp + rng.normal(0, 8, size=(h, 1, 3)).astype(np.float32)
+        backgrounds.append(np.clip(background, 0, 255).astype(np.uint8))
+    return backgrounds
+
+def box_iou(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(x1 - x0, 0) * max(y1 - y0, 0)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def blend(canvas, variant, x, y):
+    # BGRA 템플릿을 canvas 의 ( x, y ) 위치에 알파 합성 ( ROI 안에서만 계산 )
+    h, w = variant.shape[:2]
+    roi = canvas[y:y+h, x:x+w]
+    alpha = variant[:, :, 3:4].astype(np.float32) * (1.0 / 255.0)
+    roi[:] = (variant[:, :, :3] * alpha + roi * (1.0 - alpha)).astype(np.uint8)
+
+class SyntheticComposer():
+
+    __slot__ = ['templates','backgrounds','size','augmenter','scales','max_objects','max_overlap','max_tries']
+
+    def __init__(self, templates, backgrounds, size=(1280, 720), angles=range(0, 360, 15), scale_range=(0.5, 1.5), scale_step=0.1,
+                 max_objects=4, max_overlap=0.3, max_tries=10):
+        self.templates = templates
+        self.backgrounds = backgrounds
+        self.size = size
+        self.scales = [round(float(scale), 3) for scale in np.arange(scale_range[0], scale_range[1] + 1e-6, scale_step)]
+        self.augmenter = TemplateAugmenter(angles=angles, scales=self.scales, alpha=True)
+        self.max_objects = max_objects
+        self.max_overlap = max_overlap
+        self.max_tries = max_tries
+
+    def compose(self, index, seed):
+        # index 번째 이미지 생성 -> ( BGR 이미지, [(카테고리, [x0, y0, x1, y1], area), ...] )
+        rng = np.random.default_rng([seed, index])
+        w, h = self.size
+        canvas = self.backgrounds[rng.integers(len(self.backgrounds))].copy()
+
+        objects = []
+        for _ in range(rng.integers(1, self.max_objects + 1)):
+            template_idx = rng.integers(len(self.templates))
+            name, image = self.templates[template_idx]
+            angle = self.augmenter.angles[rng.integers(len(self.augmenter.angles))]
+            scale = self.scales[rng.integers(len(self.scales))]
+            variant = self.augmenter.variant(template_idx, image, angle, scale)
+            vh, vw = variant.shape[:2]
+            if vw >= w or vh >= h:
+                continue
+            # 회전으로 생긴 투명 영역은 bbox 에서 제외
+            bx, by, bw, bh = cv2.boundingRect(variant[:, :, 3])
+            if bw == 0 or bh == 0:
+                continue
+            for _ in range(self.max_tries):
+                x, y = int(rng.integers(0, w - vw)), int(rng.integers(0, h - vh))
+                bbox = [x + bx, y + by, x + bx + bw, y + by + bh]
+                if all(box_iou(bbox, other[1]) <= self.max_overlap for other in objects):
+                    blend(canvas, variant, x, y)
+                    objects.append((name, bbox, bw * bh))
+                    break
+        return canvas, objects
+
+def generate_chunk(start, end, seed, part_path, image_dir, template_folder, background_folder=None, background_video=None, options=None):
+    # worker : [start, end) 번 이미지를 생성해서 구간별 annotation 파일 작성
+    options = options or {}
+    size = tuple(options.get('size', (1280, 720)))
+    backgrounds = load_backgrounds(background_folder, background_video, size) or random_backgrounds(seed, size)
+    composer = SyntheticComposer(load_templates(template_folder), backgrounds, size,
+                                 **{k: v for k, v in options.items() if k != 'size'})
+    writer = AsyncImageWriter(max_queue=256, jpeg_quality=95)
+    store = AnnotationStore(part_path, os.path.splitext(part_path)[0] + ".jsonl", supercategory=g_supercategory, checkpoint_every=0)
+    for index in range(start, end):
+        image, objects = composer.compose(index, seed)
+        if not objects:
+            continue
+        path = os.path.join(image_dir, f'syn_{index:07d}.jpg')
+        # 합성 이미지는 재사용하지 않으므로 복사 없이 큐에 넣고, 큐가 가득 차면 대기
+        writer.write(path, image, copy=False, block=True)
+        image_id = store.add_image(path, size[0], size[1])
+        for name, bbox, area in objects:
+            store.add_annotation(image_id, name, bbox, area)
+    writer.close()
+    store.close()
+    return part_path, end - start, writer.stats['written']
+
+def generate(count, template_folder, background_folder=None, background_video=None, seed=0, workers=4, chunks=None, options=None, root=output_root):
+    if not load_templates(template_folder):
+        print(f"Error: No templates in {template_folder}")
+        return None
+    image_dir = os.path.join(root, 'images')
+    json_path = os.path.join(root, 'annotations.json')
+    shard_path = os.path.splitext(json_path)[0] + ".jsonl"
+    os.makedirs(image_dir, exist_ok=True)
+
+    chunks = chunks if chunks is not None else workers * 4
+    bounds = [count * i // chunks for i in range(chunks + 1)]
+    part_paths = [os.path.splitext(json_path)[0] + f"_part{i}.json" for i in range(chunks)]
+
+    start_time = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_chunk, bounds[i], bounds[i+1], seed, part_paths[i], image_dir, template_folder,
+                               background_folder, background_video, options) for i in range(chunks)]
+        results = [future.result() for future in futures]
+
+    # 구간 순서대로 병합 ( id 가 이미지 번호 순서로 재할당되어 실행마다 같은 결과 )
+    for path in [json_path, shard_path]:
+        if os.path.exists(path):
+            os.remove(path)
+    store = AnnotationStore(json_path, shard_path, supercategory=g_supercategory, checkpoint_every=0)
+    written = 0
+    for part_path, _, part_written in results:
+        written += part_written
+        with open(part_path, 'r', encoding='utf-8') as json_file:
+            store.merge(json.load(json_file))
+        os.remove(part_path)
+    store.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"{written} images / {chunks} chunks / {workers} workers : {elapsed:.1f} s ({written / max(elapsed, 1e-6) * 60:.0f} images/min)")
+    return store.data
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="템플릿 합성으로 COCO 데이터셋 생성 ( 영상 매칭 없음 )")
+    parser.add_argument('--count', type=int, default=10000, help="생성할 이미지 수")
+    parser.add_argument('--templates', default='video/capture', help="원본 템플릿 폴더 ( <name>_x_y.png )")
+    parser.add_argument('--backgrounds', default=None, help="배경 이미지 폴더")
+    parser.add_argument('--background-video', default=None, help="배경 프레임을 뽑을 영상")
+    parser.add_argument('--output', default=output_root, help="출력 폴더 ( images/, annotations.json )")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--chunks', type=int, default=None, help="구간 수 (기본: workers * 4)")
+    parser.add_argument('--size', type=int, nargs=2, default=[1280, 720], help="출력 이미지 크기 ( width height )")
+    parser.add_argument('--max-objects', type=int, default=4, help="이미지당 최대 객체 수")
+    parser.add_argument('--max-overlap', type=float, default=0.3, help="객체 간 최대 IoU")
+    parser.add_argument('--scale-range', type=float, nargs=2, default=[0.5, 1.5])
+    parser.add_argument('--angles', type=int, nargs='+', default=list(range(0, 360, 15)))
+    args = parser.parse_args()
+
+    options = {'size': args.size, 'angles': args.angles, 'scale_range': args.scale_range,
+               'max_objects': args.max_objects, 'max_overlap': args.max_overlap}
+    generate(args.count, args.templates, args.backgrounds, args.background_video, args.seed, args.workers, args.chunks, options, args.output)
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+'''
+ 템플릿 회전 / 크기 / 알파 변형을 디스크 대신 메모리에서 생성
+ - 한 템플릿의 모든 ( angle, scale ) 변환 행렬과 결과 크기를 numpy 로 한번에 계산
+ - 회전 + 크기 변환을 warpAffine 한번으로 처리 ( 따로 resize 하지 않음 )
+ - 결과는 ( 이름, angle, scale, alpha ) 별로 LRU 캐시 ( 같은 변형은 다시 계산하지 않음 )
+ - 결과는 make_template 과 같은 [{name: image}, ...] 형식이라 TemplateBank / 매칭에 그대로 사용
+
+ augmenter = TemplateAugmenter(angles=range(0, 181, 15), scales=[1.0])
+ templates = augmenter.augment_templates(make_template("video/capture"))
+ rotated = augmenter.variant("play", image, 45, 1.0, alpha=True)
+'''
+
+def affine_batch(shape, angles, scale=1.0):
+    # angles 개수만큼의 ( 2x3 행렬, 결과 크기 ) 를 한번에 계산 ( 회전 후 잘리지 않도록 크기 확장 )
+    h, w = shape[:2]
+    cx, cy = w // 2, h // 2
+    radians = np.deg2rad(np.asarray(angles, dtype=np.float64))
+    alpha = scale * np.cos(radians)
+    beta = scale * np.sin(radians)
+    new_w = (h * np.abs(beta) + w * np.abs(alpha)).astype(np.int32)
+    new_h = (h * np.abs(alpha) + w * np.abs(beta)).astype(np.int32)
+
+    # cv2.getRotationMatrix2D 와 같은 행렬 + 새 중심점 반영
+    matrices = np.empty((len(radians), 2, 3), dtype=np.float64)
+    matrices[:, 0, 0] = alpha
+    matrices[:, 0, 1] = beta
+    matrices[:, 0, 2] = (1 - alpha) * cx - beta * cy + new_w / 2 - cx
+    matrices[:, 1, 0] = -beta
+    matrices[:, 1, 1] = alpha
+    matrices[:, 1, 2] = beta * cx + (1 - alpha) * cy + new_h / 2 - cy
+    return matrices, np.maximum(new_w, 1), np.maximum(new_h, 1)
+
+def with_alpha(image):
+    # BGR / gray 이미지에 불투명 알파 채널 추가 ( 회전으로 생긴 바깥 영역은 투명 )
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGRA)
+    if image.shape[2] == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    return image
+
+class TemplateAugmenter():
+
+    __slot__ = ['angles','scales','alpha','max_cache','cache','hits','misses']
+
+    def __init__(self, angles=range(0, 181, 15), scales=(1.0,), alpha=False, max_cache=2048):
+        self.angles = list(angles)
+        self.scales = list(scales)
+        # alpha=True 이면 BGRA 로 생성 ( 합성용 ), False 이면 입력과 같은 채널 ( 매칭용, 바깥 영역은 0 )
+        self.alpha = alpha
+        self.max_cache = max_cache
+        self.cache = OrderedDict()  # (name, angle, scale, alpha) -> image
+        self.hits = 0
+        self.misses = 0
+
+    def cache_get(self, key):
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+        return image
+
+    def cache_put(self, key, image):
+        self.cache[key] = image
+        self.cache.move_to_end(key)
+        while self.max_cache and len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+
+    def generate(self, name, image, angles=None, scales=None, alpha=None):
+        # 캐시에 없는 ( angle, scale ) 만 모아서 행렬을 한번에 계산한 뒤 변환
+        angles = self.angles if angles is None else list(angles)
+        scales = self.scales if scales is None else list(scales)
+        alpha = self.alpha if alpha is None else alpha
+        source = with_alpha(image) if alpha else image
+        border = (0, 0, 0, 0) if alpha else 0
+
+        variants = []
+        for scale in scales:
+            missing = [angle for angle in angles if (name, angle, scale, alpha) not in self.cache]
+            fresh = {}
+            if missing:
+                matrices, widths, heights = affine_batch(source.shape, missing, scale)
+                for angle, matrix, new_w, new_h in zip(missing, matrices, widths, heights):
+                    warped = cv2.warpAffine(source, matrix, (int(new_w), int(new_h)), flags=cv2.INTER_LINEAR,
+                                            borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+                    self.cache_put((name, angle, scale, alpha), warped)
+                    fresh[angle] = warped
+                    self.misses += 1
+            for angle in angles:
+                warped = fresh[angle] if angle in fresh else self.cache_get((name, angle, scale, alpha))
+                variants.append((angle, scale, warped))
+        return variants
+
+    def variant(self, name, image, angle, scale=1.0, alpha=None):
+        return self.generate(name, image, [angle], [scale], alpha)[0][2]
+
+    def augment_templates(self, templates, angles=None, scales=None, alpha=None):
+        # [{name: image}, ...] -> [{name_angle_scale: image}, ...] ( 이름의 첫 '_' 앞부분은 카테고리로 유지 )
+        augmented = []
+        for template in templates:
+            for name, image in template.items():
+                if image is None:
+                    continue
+                for angle, scale, warped in self.generate(name, image, angles, scales, alpha):
+                    augmented.append({f"{name}_{angle}_{scale}": warped})
+        return augmented
+
+    def clear(self):
+        self.cache.clear()
+
+    def report(self):
+        size_mb = sum(image.nbytes for image in self.cache.values()) / (1024 * 1024)
+        return f"Augmenter : {len(self.cache)} variants cached ({size_mb:.1f} MB), {self.hits} hits / {self.misses} generated"
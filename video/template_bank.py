@@ -0,0 +1,76 @@
+import os
+import glob
+import time
+import threading
+
+'''
+ 영상 처리 동안 템플릿을 한번만 읽어두는 저장소
+ - 프레임마다 폴더 검색 / 이미지 디코딩을 반복하지 않음
+ - 프레임 처리에는 템플릿 id 만 전달하고 배열은 bank 에서 조회
+ - watch=True 이면 폴더 변경( 파일 추가/수정/삭제 ) 시 다시 로드
+
+ bank = TemplateBank("video/capture/arg", loader=make_template)
+ templates = bank.get_many(bank.ids())
+'''
+
+IMAGE_EXTENSIONS = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.tiff']
+
+class TemplateBank():
+
+    __slot__ = ['folder','loader','watch','watch_interval','templates','signature','checked_at','lock']
+
+    def __init__(self, folder, loader, watch=False, watch_interval=2.0):
+        # loader(folder) -> [{name: image}, ...] ( labotory.make_template )
+        self.folder = folder
+        self.loader = loader
+        self.watch = watch
+        self.watch_interval = watch_interval
+        self.templates = []
+        self.signature = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.load()
+
+    def folder_signature(self):
+        files = []
+        for extension in IMAGE_EXTENSIONS:
+            files.extend(glob.glob(os.path.join(self.folder, extension)))
+        signature = []
+        for file in sorted(files):
+            stat = os.stat(file)
+            signature.append((file, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self):
+        start = time.perf_counter()
+        templates = self.loader(self.folder)
+        signature = self.folder_signature()
+        with self.lock:
+            self.templates = templates
+            self.signature = signature
+            self.checked_at = time.monotonic()
+        print(f"Template bank : {len(templates)} templates loaded ({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    def reload_if_changed(self):
+        # watch_interval 마다 폴더 상태만 확인 ( 변경이 없으면 디코딩하지 않음 )
+        if not self.watch or time.monotonic() - self.checked_at < self.watch_interval:
+            return False
+        self.checked_at = time.monotonic()
+        if self.folder_signature() == self.signature:
+            return False
+        self.load()
+        return True
+
+    def ids(self):
+        self.reload_if_changed()
+        with self.lock:
+            return list(range(len(self.templates)))
+
+    def get(self, template_id):
+        with self.lock:
+            return self.templates[template_id]
+
+    def get_many(self, template_ids):
+        # 매칭 쪽에서 목록을 소비해도 bank 는 유지되도록 새 리스트로 반환
+        with self.lock:
+            return [self.templates[template_id] for template_id in template_ids]
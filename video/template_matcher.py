@@ -13,6 +13,15 @@ from PyQt5.QtCore import pyqtSignal, QThread
 
 # from utils.score_of_sds import find_best_match,resize_image
 
+import sys
+# video 스크립트는 video/ 가 sys.path[0] 이므로 저장소 루트를 추가해서 utils 패키지 공유
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from utils.image_writer import get_image_writer
+from utils.template_tracker import TemplateTracker
+
 from concurrent.futures import ThreadPoolExecutor,ProcessPoolExecutor, as_completed
 from threading import Semaphore
 
@@ -242,6 +251,9 @@ class TemplateMatcher:
         self.lab_exp_1 = []
         self.lab_exp_2 = []
         self.lab_cnt = 0
+        
+        # experience_video(track=True) 에서 템플릿 이름별 TemplateTracker
+        self.trackers = {}
 
     def multi_scale_match_templates(self, semaphore, gray_frame, pbar):
         with semaphore:
@@ -396,7 +408,21 @@ class TemplateMatcher:
 
         return self.matches
     
-    def experience_video(self,image,templates):
+    def track_template(self, gray_frame, template_tuple):
+        # 템플릿별 tracker 로 직전 위치 주변만 검색 ( 실패시 전체 화면 재검색 )
+        with self.lock:
+            tracker = self.trackers.get(template_tuple[0])
+            if tracker is None:
+                tracker = TemplateTracker(template_tuple[1], self.scale_range, self.threshold)
+                self.trackers[template_tuple[0]] = tracker
+        result = tracker.update(gray_frame)
+        if result is None:
+            # multi_scale_match_mixed_templates 와 같이 미검출은 (0, 0) 위치로 반환
+            return ((0, 0), 1.0, 0.0, template_tuple)
+        loc, scale, score = result
+        return (loc, scale, score, template_tuple)
+    
+    def experience_video(self,image,templates,track=False):
         self.matches.clear()
         
         # h,w,_ = image.shape
@@ -427,7 +453,10 @@ class TemplateMatcher:
                 # Dict 처리
                 template_tuple = [ (k,v) for k,v in template.items()][0]
                 # for scale in np.arange(self.scale_range[0], self.scale_range[1], self.scale_range[2]):
-                lab_muti_tm.append(executor.submit(self.multi_scale_match_mixed_templates,semaphore,gray_frame, template_tuple,None))
+                if track:
+                    lab_muti_tm.append(executor.submit(self.track_template, gray_frame, template_tuple))
+                else:
+                    lab_muti_tm.append(executor.submit(self.multi_scale_match_mixed_templates,semaphore,gray_frame, template_tuple,None))
             
             # 작업이 완료될 때까지 대기하고 결과를 출력합니다.
             for lab_1 in as_completed(lab_muti_tm):
@@ -555,7 +584,8 @@ class TemplateMatcher:
                 cv2.putText(image, f'{name} ,{score:.2f}', (top_left[0], top_left[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 0, 0), 2)
         
         path = f'lab_result/{self.lab_cnt}.jpg'
-        cv2.imwrite(path,image)
+        # 프레임마다 호출되므로 저장은 백그라운드 writer 에 맡김
+        get_image_writer().write(path,image)
         self.lab_cnt+=1
         return image
     